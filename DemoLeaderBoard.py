@@ -3,6 +3,7 @@ Leaderboard System Demo Class
 Demonstrates all features of the leaderboard system
 """
 from leaderboard_system import LeaderboardSystem
+from event_log import EventLog
 
 
 class LeaderboardDemo:
@@ -16,11 +17,12 @@ class LeaderboardDemo:
     - Player information lookup
     - Batch processing
     - Incremental processing
+    - Crash recovery from the update log
     """
 
     def __init__(self):
         """Initialize demo with a new leaderboard system"""
-        self.system = LeaderboardSystem()
+        self.system = LeaderboardSystem(log_level=EventLog.DEBUG)
 
     def run_basic_demo(self):
         """
@@ -89,7 +91,7 @@ class LeaderboardDemo:
         print("\n-----------------------------------------------")
 
         # Create a fresh system for this demo
-        self.system = LeaderboardSystem()
+        self.system = LeaderboardSystem(log_level=EventLog.DEBUG)
 
         print("\n--- Receiving Multiple Updates ---")
 
@@ -124,7 +126,7 @@ class LeaderboardDemo:
         print("\n-----------------------------------------------")
 
         # Create a fresh system for this demo
-        self.system = LeaderboardSystem()
+        self.system = LeaderboardSystem(log_level=EventLog.DEBUG)
 
         # Tournament players
         players = [
@@ -190,7 +192,7 @@ class LeaderboardDemo:
         print("\n-----------------------------------------------")
 
         # Create a fresh system for this demo
-        self.system = LeaderboardSystem()
+        self.system = LeaderboardSystem(log_level=EventLog.COUNTERS)  # no console I/O in the timings
 
         import time
         import random
@@ -239,7 +241,7 @@ class LeaderboardDemo:
         print("\n-----------------------------------------------")
 
         # Create a fresh system for this demo
-        self.system = LeaderboardSystem()
+        self.system = LeaderboardSystem(log_level=EventLog.DEBUG)
 
         # Add some players
         print("\n--- Adding Players ---")
@@ -278,6 +280,95 @@ class LeaderboardDemo:
         if player is None:
             print("Player p2 (Burrow) not found - successfully removed!")
 
+    def run_async_demo(self):
+        """
+        Demonstrate the asyncio front-end.
+        Shows: awaiting submissions, background draining, and async queries.
+        """
+        print("\n-----------------------------------------------")
+        print("DEMO 7: ASYNC FRONT-END")
+        print("\n-----------------------------------------------")
+
+        import asyncio
+        from async_leaderboard import AsyncLeaderboard
+
+        # Create a fresh system for this demo
+        self.system = LeaderboardSystem(log_level=EventLog.DEBUG)
+
+        async def simulate_server():
+            board = AsyncLeaderboard(self.system)
+            await board.start()
+
+            # Many "requests" submit at once; none of them block the loop
+            submissions = [board.submit_score(f"p{i}", f"Player{i}", 1000 + i * 150)
+                           for i in range(1, 6)]
+            await asyncio.gather(*submissions)
+
+            # One submitter waits until its own update is on the leaderboard
+            player = await board.submit_and_wait("p1", "Player1", 2500)
+            rank = await board.get_player_rank("p1")
+            print(f"{player.username} applied with {player.score} -> rank #{rank}")
+
+            await board.stop()
+
+        asyncio.run(simulate_server())
+
+        self.system.display_leaderboard()
+
+    def run_crash_recovery_demo(self):
+        """
+        Demonstrate recovery from the write-ahead update log.
+        Shows: logged submissions, removals and clears replayed after a crash.
+        """
+        print("\n-----------------------------------------------")
+        print("DEMO 8: CRASH RECOVERY")
+        print("\n-----------------------------------------------")
+
+        import os
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as directory:
+            log_path = os.path.join(directory, "updates.log")
+            snapshot_path = os.path.join(directory, "leaderboard.snap")
+
+            # Create a fresh system for this demo, logging every change
+            self.system = LeaderboardSystem(log_level=EventLog.INFO)
+            self.system.enable_update_log(log_path)
+
+            self.system.submit_score("p1", "Allen", 2000)
+            self.system.submit_score("p2", "Burrow", 1500)
+            self.system.submit_score("p3", "Jackson", 2500)
+            self.system.process_updates()
+            self.system.save_snapshot(snapshot_path)
+
+            # Changes after the snapshot exist only in the log
+            self.system.submit_score("p4", "Mahomes", 1800)
+            self.system.submit_score("p1", "Allen", 2700)
+            self.system.remove_player("p2")
+            self.system.import_players([("p5", "Rogers", 2200)])
+            self.system.submit_score("p6", "Stafford", 1900)  # still queued
+
+            # "Crash": the process dies after the log was committed
+            self.system.update_log.flush()
+
+            print("\n--- Recovering: snapshot + log replay ---")
+            recovered = LeaderboardSystem(log_level=EventLog.INFO)
+            recovered.restore_snapshot(snapshot_path)
+            recovered.enable_update_log(log_path)
+
+            self.system.process_updates()
+            recovered.process_updates()
+
+            before = [(p.player_id, p.username, p.score) for p in self.system.get_leaderboard()]
+            after = [(p.player_id, p.username, p.score) for p in recovered.get_leaderboard()]
+            assert before == after, "recovered leaderboard differs from the live one"
+            print("Recovered leaderboard matches the live one")
+
+            recovered.update_log.close()
+            self.system.update_log.close()
+
+        recovered.display_leaderboard()
+
     def run_all_demos(self):
         """Run all demonstration scenarios"""
         print("\n-----------------------------------------------")
@@ -300,6 +391,12 @@ class LeaderboardDemo:
         input("\n\nPress Enter to continue to Player Operations Demo...")
         self.run_player_operations_demo()
 
+        input("\n\nPress Enter to continue to Async Front-End Demo...")
+        self.run_async_demo()
+
+        input("\n\nPress Enter to continue to Crash Recovery Demo...")
+        self.run_crash_recovery_demo()
+
         print("\n-----------------------------------------------")
         print(" ALL DEMOS COMPLETE! ".center(70, "="))
         print("\n-----------------------------------------------")
@@ -329,7 +426,13 @@ if __name__ == "__main__":
 
     print("\n\n")
     demo.run_player_operations_demo()
+
+    print("\n\n")
+    demo.run_async_demo()
+
+    print("\n\n")
+    demo.run_crash_recovery_demo()
     """
     print("\n-----------------------------------------------")
     print(" ALL DEMOS COMPLETE! ")
-    print("\n-----------------------------------------------")
\ No newline at end of file
+    print("\n-----------------------------------------------")
\ No newline at end of file
@@ -2,56 +2,139 @@
 FIFO Queue Implementation. Ensures scores are enqueued and dequeued in the order of arrival
 Chase Barman
 """
-from datetime import datetime
+import threading
+import time
+from collections import deque
 
 
 class UpdateRequest:
     """
     Represents a score update request.
+    Slotted, with a float timestamp (seconds since the epoch), to keep
+    large backlogs of queued updates compact.
     """
 
-    def __init__(self, player_id, new_score, timestamp=None):
+    __slots__ = ("player_id", "new_score", "timestamp", "username")
+
+    def __init__(self, player_id, new_score, timestamp=None, username=None):
         """
         Initialize an update request.
         """
         self.player_id = player_id
         self.new_score = new_score
-        self.timestamp = timestamp or datetime.now()
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.username = username
 
 
 class FIFOQueueList:
+    """
+    FIFO queue stored in a circular buffer (ring buffer).
+
+    Dequeued slots are cleared and reused, and the buffer doubles when full
+    and halves when it is mostly empty, so memory tracks the number of
+    pending requests instead of the number ever enqueued.
+
+    An optional max_size bounds the queue. When it is full, overflow_policy
+    decides what enqueue does:
+    - "reject": refuse the new request (enqueue returns False)
+    - "drop_oldest": discard the oldest pending request to make room
+    - "block": wait for a consumer to make room. A plain FIFOQueueList has no
+      other thread that could dequeue, so here it behaves like "reject".
+    """
+
+    REJECT = "reject"
+    DROP_OLDEST = "drop_oldest"
+    BLOCK = "block"
+    OVERFLOW_POLICIES = (REJECT, DROP_OLDEST, BLOCK)
 
-    def __init__(self, compact_threshold=100):
+    def __init__(self, compact_threshold=100, max_size=None, overflow_policy=REJECT):
         """
         Initialize an empty FIFO queue.
+        compact_threshold is the smallest buffer capacity; the buffer is
+        never shrunk below it.
         """
-        self.items = []  # The actual storage
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        if max_size is not None and max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.compact_threshold = max(1, compact_threshold)
+        self.max_size = max_size
+        self.overflow_policy = overflow_policy
+
+        self.items = [None] * self.compact_threshold  # The actual storage
         self.front = 0  # Index of front element
+        self.count = 0  # Number of pending elements
+
+        # Overflow statistics
+        self.dropped = 0
+        self.rejected = 0
+
+        self.hooks = None  # HookRegistry while tracers are attached (see hooks.py)
 
     def enqueue(self, update_request):
         """
         Add an update request to the end of the queue.
-        Time Complexity: O(1)
+        Returns False if the request was rejected because the queue is full.
+        Time Complexity: O(1) amortized
         """
-        self.items.append(update_request)
+        if self.is_full():
+            if self.overflow_policy == self.DROP_OLDEST:
+                self.dequeue()
+                self.dropped += 1
+            else:
+                self.rejected += 1
+                return False
+
+        if self.count == len(self.items):
+            self.resize(2 * len(self.items))
+
+        back = (self.front + self.count) % len(self.items)
+        self.items[back] = update_request
+        self.count += 1
+        return True
 
     def dequeue(self):
         """
         Remove and return the oldest update request (FIFO).
-        Time Complexity: O(1), unlike the pop() method which is O(n)
-        Potential Problem: Since no items are actually removed from the queue, the queue size can grow by a lot.
+        Time Complexity: O(1) amortized, unlike the pop(0) method which is O(n)
+        The slot is cleared so the request can be garbage collected.
         """
         if self.is_empty():
             return None
 
+        hooks = self.hooks
+        if hooks is not None:
+            hooks.begin("queue.dequeue")
+
         # Get the element at front
         item = self.items[self.front]
+        self.items[self.front] = None
 
-        # Move the front pointer forward
-        self.front += 1
+        # Move the front pointer forward, wrapping around the buffer
+        self.front = (self.front + 1) % len(self.items)
+        self.count -= 1
 
+        # Give memory back once the buffer is mostly empty
+        capacity = len(self.items)
+        if capacity > self.compact_threshold and self.count <= capacity // 4:
+            self.resize(max(self.compact_threshold, capacity // 2))
+
+        if hooks is not None:
+            hooks.end("queue.dequeue")
         return item
 
+    def resize(self, capacity):
+        """
+        Copy the pending requests, in order, into a buffer of the new capacity.
+        Time Complexity: O(count)
+        """
+        items = [None] * capacity
+        for i in range(self.count):
+            items[i] = self.items[(self.front + i) % len(self.items)]
+
+        self.items = items
+        self.front = 0
 
     def peek(self):
         """
@@ -62,21 +145,218 @@ class FIFOQueueList:
             return None
         return self.items[self.front]
 
+    def to_list(self):
+        """
+        Get the pending requests in FIFO order without removing them.
+        Time Complexity: O(count)
+        """
+        capacity = len(self.items)
+        return [self.items[(self.front + i) % capacity] for i in range(self.count)]
+
     def is_empty(self):
         """
         Check if the queue is empty.
         """
-        return self.front >= len(self.items)
+        return self.count == 0
+
+    def is_full(self):
+        """
+        Check if a bounded queue has reached max_size.
+        """
+        return self.max_size is not None and self.count >= self.max_size
 
     def get_size(self):
         """
         Get the number of requests in the queue.
         """
-        return len(self.items) - self.front
+        return self.count
 
     def clear(self):
         """Remove all requests from the queue"""
-        self.items = []
+        self.items = [None] * self.compact_threshold
         self.front = 0
+        self.count = 0
+
+
+class ConcurrentFIFOQueue(FIFOQueueList):
+    """
+    Thread-safe FIFO queue for many producer threads and a consumer thread.
+
+    Every operation runs under one lock. With the "block" overflow policy a
+    full queue makes enqueue wait until a consumer frees a slot, and
+    dequeue can wait for a request to arrive. Like queue.Queue, consumers
+    call task_done() once a request is fully handled so join() can wait
+    for the queue to go idle, and join_enqueued() for just the requests
+    enqueued before the call.
+
+    Requests are finished in FIFO order: dequeued ones when task_done()
+    covers them, dropped or cleared ones once every request dequeued before
+    them is done. finished therefore counts a prefix of the enqueue order,
+    and request number k is done exactly when finished >= k.
+    """
+
+    def __init__(self, compact_threshold=100, max_size=None, overflow_policy=FIFOQueueList.REJECT):
+        """
+        Initialize an empty thread-safe FIFO queue.
+        """
+        # RLock: the drop_oldest path of enqueue calls dequeue
+        self.lock = threading.RLock()
+        self.not_empty = threading.Condition(self.lock)
+        self.not_full = threading.Condition(self.lock)
+        self.all_done = threading.Condition(self.lock)
+
+        self.enqueued = 0  # requests accepted so far
+        self.finished = 0  # leading requests handled or discarded
+        self.taken = 0  # requests dequeued by consumers
+        self.handled = 0  # dequeued requests marked task_done
+        self.discarded = deque()  # (taken when discarded, count) not yet finished
+
+        super().__init__(compact_threshold, max_size, overflow_policy)
+
+    def enqueue(self, update_request, timeout=None):
+        """
+        Add an update request to the end of the queue.
+        With the "block" policy, waits up to timeout seconds (None = forever)
+        for room; returns False if the request was not accepted.
+        """
+        with self.lock:
+            if self.overflow_policy == self.BLOCK:
+                self.not_full.wait_for(lambda: not self.is_full(), timeout)
+
+            dropped_before = self.dropped
+            if not super().enqueue(update_request):
+                return False
 
+            self.enqueued += 1
 
+            # a dropped request never reaches a consumer (the drop went
+            # through dequeue(), which counted it as taken)
+            dropped = self.dropped - dropped_before
+            if dropped:
+                self.taken -= dropped
+                self.discard(dropped)
+
+            self.not_empty.notify()
+            return True
+
+    def dequeue(self, block=False, timeout=None):
+        """
+        Remove and return the oldest update request (FIFO).
+        With block=True, waits up to timeout seconds (None = forever) for a
+        request; returns None if the queue is still empty.
+        """
+        with self.lock:
+            if block:
+                self.not_empty.wait_for(lambda: not self.is_empty(), timeout)
+
+            item = super().dequeue()
+            if item is not None:
+                self.taken += 1
+                self.not_full.notify()
+            return item
+
+    def wait_not_empty(self, timeout=None):
+        """
+        Wait up to timeout seconds (None = forever) for a request to arrive,
+        without removing it. Returns False if the queue is still empty.
+        """
+        with self.lock:
+            return self.not_empty.wait_for(lambda: not self.is_empty(), timeout)
+
+    def wait_not_full(self, timeout=None):
+        """
+        Wait up to timeout seconds (None = forever) for a bounded queue to
+        have room, without enqueueing. Returns False if it is still full.
+        """
+        with self.lock:
+            return self.not_full.wait_for(lambda: not self.is_full(), timeout)
+
+    def dequeue_batch(self, max_items, timeout=None):
+        """
+        Wait up to timeout seconds for at least one request, then remove and
+        return up to max_items requests in FIFO order (possibly an empty list).
+        """
+        with self.lock:
+            self.not_empty.wait_for(lambda: not self.is_empty(), timeout)
+
+            batch = []
+            while len(batch) < max_items and not self.is_empty():
+                batch.append(super().dequeue())
+
+            if batch:
+                self.taken += len(batch)
+                self.not_full.notify(len(batch))
+            return batch
+
+    def discard(self, count):
+        """
+        Count requests removed without reaching a consumer; caller holds the
+        lock. They finish once the requests dequeued before them are handled.
+        """
+        if self.handled == self.taken:
+            self.finished += count
+            self.all_done.notify_all()
+        else:
+            self.discarded.append((self.taken, count))
+
+    def task_done(self, count=1):
+        """
+        Mark count dequeued requests as fully handled.
+        """
+        with self.lock:
+            count = min(count, self.taken - self.handled)
+            self.handled += count
+            self.finished += count
+
+            while self.discarded and self.discarded[0][0] <= self.handled:
+                self.finished += self.discarded.popleft()[1]
+
+            self.all_done.notify_all()
+
+    def join(self, timeout=None):
+        """
+        Wait until every enqueued request has been marked task_done.
+        Returns False if the timeout expired first.
+        """
+        with self.lock:
+            return self.all_done.wait_for(lambda: self.finished == self.enqueued, timeout)
+
+    def join_enqueued(self, timeout=None):
+        """
+        Wait until every request enqueued before this call is done. Unlike
+        join(), requests enqueued meanwhile are not waited for, so this
+        returns even while producers keep the queue busy.
+        Returns False if the timeout expired first.
+        """
+        with self.lock:
+            target = self.enqueued
+            return self.all_done.wait_for(lambda: self.finished >= target, timeout)
+
+    def peek(self):
+        """View the next element without removing it"""
+        with self.lock:
+            return super().peek()
+
+    def to_list(self):
+        """Get the pending requests in FIFO order without removing them"""
+        with self.lock:
+            return super().to_list()
+
+    def is_empty(self):
+        """Check if the queue is empty"""
+        with self.lock:
+            return super().is_empty()
+
+    def get_size(self):
+        """Get the number of requests in the queue"""
+        with self.lock:
+            return super().get_size()
+
+    def clear(self):
+        """Remove all requests from the queue"""
+        with self.lock:
+            pending = self.count
+            super().clear()
+            if pending:
+                self.discard(pending)
+            self.not_full.notify_all()
@@ -0,0 +1,240 @@
+"""
+asyncio front-end for the leaderboard system.
+Lets an asyncio server submit scores and query rankings without blocking
+the event loop on print calls or on a long process_updates() drain.
+"""
+import asyncio
+
+from leaderboard_system import LeaderboardSystem
+from FIFO_Queue import FIFOQueueList, UpdateRequest
+
+
+class AsyncLeaderboard:
+    """
+    Async facade over a LeaderboardSystem that lives on the event loop.
+
+    Design:
+    1. submit_score() queues (and logs) an UpdateRequest through the
+       system's accept_update and returns a Future
+    2. A background task drains the update_queue in batches, yielding to
+       the event loop between batches
+    3. Each Future resolves once its update has been applied
+
+    Everything but the update log's write and fsync (run in the default
+    executor) happens on the loop's thread, so no locking is needed:
+    queries always see whole updates because a batch never awaits
+    mid-update.
+    """
+
+    def __init__(self, system=None, batch_size=256):
+        """
+        Wrap an existing LeaderboardSystem (or a new one).
+        batch_size caps how many updates are applied before yielding.
+        """
+        self.system = system if system is not None else LeaderboardSystem()
+        self.batch_size = batch_size
+
+        self.waiters = {}  # id(UpdateRequest) → Future for its submitter
+        self.last_future = None  # Future of the newest accepted submission
+        self.updates_ready = asyncio.Event()  # set when the queue has work
+        self.space_available = asyncio.Condition()  # for the "block" policy
+        self.drain_task = None
+        self.running = False
+
+    async def start(self):
+        """Start the background drain task"""
+        if self.drain_task is None:
+            self.running = True
+            self.drain_task = asyncio.create_task(self.drain_loop())
+
+    async def stop(self, drain=True):
+        """
+        Stop the drain task. With drain=True, pending updates are applied first.
+        """
+        if self.drain_task is None:
+            return
+
+        if drain:
+            await self.flush()
+
+        self.running = False
+        self.updates_ready.set()
+        await self.drain_task
+        self.drain_task = None
+
+    async def flush(self):
+        """Wait until every update submitted so far has been applied"""
+        # the newest submission is applied last (FIFO)
+        if self.last_future is not None:
+            await asyncio.shield(self.last_future)
+
+    async def submit_score(self, player_id, username, score):
+        """
+        Submit a score update for a player.
+        Returns a Future that resolves to the updated Player once the update
+        has been applied, to None if the update was rejected or dropped by a
+        bounded queue (or cleared from it), and to the exception if applying
+        it failed. Raises ValueError like LeaderboardSystem.submit_score if
+        the update log cannot record the update.
+        """
+        queue = self.system.update_queue
+        future = asyncio.get_running_loop().create_future()
+
+        update = UpdateRequest(player_id, score, username=username)
+
+        if queue.is_full() and queue.overflow_policy == FIFOQueueList.BLOCK:
+            # wait for the drain task instead of blocking the loop
+            async with self.space_available:
+                await self.space_available.wait_for(lambda: not queue.is_full())
+
+        # through the system's accept path, so the update is logged too
+        oldest = queue.peek()
+        dropped_before = queue.dropped
+        if not self.system.accept_update(update):
+            future.set_result(None)
+            return future
+
+        if queue.dropped != dropped_before:
+            self.resolve(oldest, None)
+
+        self.waiters[id(update)] = future
+        self.last_future = future
+        self.updates_ready.set()
+        return future
+
+    async def submit_and_wait(self, player_id, username, score):
+        """
+        Submit a score update and wait until it has been applied.
+        Returns the updated Player (None if the update was not accepted).
+        """
+        future = await self.submit_score(player_id, username, score)
+        return await future
+
+    def resolve(self, update, result):
+        """Complete the submitter's Future for an update, if any"""
+        future = self.waiters.pop(id(update), None)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    def fail(self, update, error):
+        """Pass the error from applying an update to its submitter's Future"""
+        future = self.waiters.pop(id(update), None)
+        if future is not None and not future.done():
+            future.set_exception(error)
+
+    def resolve_orphans(self):
+        """
+        Resolve the Futures of updates that left the queue without being
+        applied, e.g. because system.clear_leaderboard() emptied it.
+        Called when the queue is empty, so every remaining waiter is one.
+        """
+        waiters, self.waiters = self.waiters, {}
+        for future in waiters.values():
+            if not future.done():
+                future.set_result(None)
+
+    async def drain_loop(self):
+        """
+        Background task: apply queued updates in FIFO order, batch by batch.
+        """
+        queue = self.system.update_queue
+
+        while self.running or not queue.is_empty():
+            if queue.is_empty():
+                if self.waiters:
+                    self.resolve_orphans()
+                self.updates_ready.clear()
+                await self.updates_ready.wait()
+                continue
+
+            # commit logged updates before applying them, as process_updates
+            # does. The write and fsync run in an executor so the loop keeps
+            # serving; only updates accepted before the flush are applied.
+            limit = self.batch_size
+            log = self.system.update_log
+            if log is not None:
+                accepted = self.system.total_updates
+                await asyncio.get_running_loop().run_in_executor(None, log.flush)
+
+                arrived = self.system.total_updates - accepted
+                if arrived < 0:
+                    continue  # the leaderboard was cleared meanwhile
+                limit = min(limit, queue.get_size() - arrived)
+
+            if limit > 0:
+                self.apply_batch(limit)
+
+            async with self.space_available:
+                self.space_available.notify_all()
+
+            # let submitters and queries run between batches
+            await asyncio.sleep(0)
+
+    def apply_batch(self, limit):
+        """
+        Apply up to limit queued updates, as one process_updates batch: the
+        batch runs the "system.process_updates" hooks and processing events.
+        Never awaits, so queries see either none or all of an update.
+        """
+        system = self.system
+        queue = system.update_queue
+        hooks = system.hooks
+        if hooks is not None:
+            hooks.begin("system.process_updates")
+
+        try:
+            system.events.info("processing_started", "\nProcessing updates...")
+            processed = 0
+
+            for _ in range(limit):
+                update = queue.dequeue()
+                if update is None:
+                    break
+
+                # one bad update (e.g. a score that does not compare with the
+                # others) fails its own Future and must not stop the drain
+                try:
+                    system.process_update(update)
+                except Exception as error:
+                    self.fail(update, error)
+                    continue
+
+                processed += 1
+                self.resolve(update, system.player_lookup.get(update.player_id))
+
+            system.events.info("processing_finished", "Processed {} updates ({} remaining)",
+                               processed, queue.get_size())
+        finally:
+            if hooks is not None:
+                hooks.end("system.process_updates")
+
+    # ------------------------------------------------------------------
+    # Queries - all O(log n) (or output-sized) reads on the loop thread
+    # ------------------------------------------------------------------
+
+    async def get_leaderboard(self, top_n=None):
+        return self.system.get_leaderboard(top_n)
+
+    async def get_leaderboard_page(self, offset, limit):
+        return self.system.get_leaderboard_page(offset, limit)
+
+    async def get_player_rank(self, player_id):
+        return self.system.get_player_rank(player_id)
+
+    async def get_player_at_rank(self, rank):
+        return self.system.get_player_at_rank(rank)
+
+    async def get_player(self, player_id):
+        return self.system.get_player(player_id)
+
+    async def get_players_in_score_range(self, low, high):
+        return self.system.get_players_in_score_range(low, high)
+
+    async def count_players_above(self, score):
+        return self.system.count_players_above(score)
+
+    async def get_score_percentile(self, percentile):
+        return self.system.get_score_percentile(percentile)
+
+    async def get_stats(self):
+        return self.system.get_stats()
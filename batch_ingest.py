@@ -0,0 +1,73 @@
+"""
+Preparation of score batches for LeaderboardSystem.submit_scores_batch:
+deduplicate (last write wins) and sort by (score, player_id).
+
+NumPy is optional. With it, both steps run as vectorized array operations;
+without it, the same result is computed with a dict and sorted().
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def prepare_batch(player_ids, scores, usernames=None):
+    """
+    Keep each player's last entry and sort the survivors ascending by
+    (score, player_id), the BST's order.
+    Returns (ids, scores, usernames) as Python lists; usernames is None if
+    none were given.
+    Time Complexity: O(k log k) for k entries
+    """
+    if len(player_ids) != len(scores) or (usernames is not None and len(usernames) != len(scores)):
+        raise ValueError("player_ids, scores and usernames must have the same length")
+
+    if np is not None:
+        prepared = prepare_batch_numpy(player_ids, scores, usernames)
+        if prepared is not None:
+            return prepared
+
+    latest = {}  # player_id → index of the player's last entry
+    for index, player_id in enumerate(player_ids):
+        latest[player_id] = index
+
+    keep = sorted(latest.values(), key=lambda index: (scores[index], player_ids[index]))
+
+    return ([player_ids[i] for i in keep], [scores[i] for i in keep],
+            None if usernames is None else [usernames[i] for i in keep])
+
+
+def prepare_batch_numpy(player_ids, scores, usernames=None):
+    """
+    prepare_batch with NumPy: np.unique for the dedupe, np.lexsort for the sort.
+    Returns None, leaving the batch to the dict path, when the arrays would
+    not hand back the ids and scores unchanged: object arrays, or a
+    sequence of mixed ids (or int and float scores) that NumPy would turn
+    into strings (or floats).
+    """
+    ids = np.asarray(player_ids)
+    if ids.dtype.kind not in "iuU":
+        return None
+    if (ids.dtype.kind == "U" and not isinstance(player_ids, np.ndarray)
+            and not all(isinstance(player_id, str) for player_id in player_ids)):
+        return None
+
+    score_array = np.asarray(scores)
+    if score_array.dtype.kind not in "iuf":
+        return None
+    if (score_array.dtype.kind == "f" and not isinstance(scores, np.ndarray)
+            and not all(isinstance(score, float) for score in scores)):
+        return None
+
+    # the first occurrence in the reversed batch is each player's last entry
+    _, first = np.unique(ids[::-1], return_index=True)
+    keep = len(ids) - 1 - first
+
+    # lexsort sorts by its last key first: score, then player_id
+    keep = keep[np.lexsort((ids[keep], score_array[keep]))]
+
+    names = None
+    if usernames is not None:
+        names = np.asarray(usernames, dtype=object)[keep].tolist()
+
+    return ids[keep].tolist(), score_array[keep].tolist(), names
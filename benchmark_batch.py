@@ -0,0 +1,61 @@
+"""
+Batch ingestion benchmark: submit_scores_batch against the per-item
+submit_score + process_updates loop, for end-of-match sized batches on an
+empty and on an already populated leaderboard.
+
+Uses NumPy arrays when NumPy is installed, plain lists otherwise.
+
+Usage:
+    python benchmark_batch.py             # 100,000 existing players
+    python benchmark_batch.py 20000       # smaller board
+"""
+import random
+import sys
+import time
+
+from batch_ingest import np
+from leaderboard_system import LeaderboardSystem
+
+
+def populated(existing):
+    """A leaderboard holding existing players"""
+    system = LeaderboardSystem()
+    system.import_players((f"p{i}", "Player", i * 7 % 100_003) for i in range(existing))
+    return system
+
+
+def per_item(system, ids, scores):
+    start = time.perf_counter()
+    for player_id, score in zip(ids, scores):
+        system.submit_score(player_id, None, score)
+    system.process_updates()
+    return time.perf_counter() - start
+
+
+def batched(system, ids, scores):
+    if np is not None:
+        ids, scores = np.array(ids), np.array(scores)
+
+    start = time.perf_counter()
+    system.submit_scores_batch(ids, scores)
+    return time.perf_counter() - start
+
+
+def run(existing):
+    rng = random.Random(1)
+    print(f"\n--- Batch ingestion ({'NumPy' if np is not None else 'pure Python, NumPy not installed'}) ---")
+    print(f"{'Board':>10} {'Batch':>8} {'Per-item (ms)':>15} {'Batch (ms)':>12} {'Speedup':>9}")
+
+    for board in (0, existing):
+        for size in (10_000, 50_000):
+            # repeated ids exercise the last-write-wins dedupe
+            ids = [f"p{rng.randrange(max(board, size))}" for _ in range(size)]
+            scores = [rng.randrange(100_003) for _ in range(size)]
+
+            loop = per_item(populated(board), ids, scores)
+            batch = batched(populated(board), ids, scores)
+            print(f"{board:>10,} {size:>8,} {loop * 1000:>15.1f} {batch * 1000:>12.1f} {loop / batch:>8.1f}x")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
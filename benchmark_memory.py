@@ -0,0 +1,100 @@
+"""
+Memory benchmark: bytes per player for the leaderboard's per-entry objects.
+
+Compares the slotted Player / BSTNode / UpdateRequest classes against the
+original dict-backed versions that stored a datetime per object.
+
+Usage:
+    python benchmark_memory.py            # 1,000,000 entries
+    python benchmark_memory.py 100000     # smaller run
+"""
+import gc
+import sys
+import tracemalloc
+from datetime import datetime
+
+from bst import BSTNode
+from player import Player
+from FIFO_Queue import UpdateRequest
+
+
+# ----------------------------------------------------------------------------
+# The original (dict-backed, datetime-stamped) classes, kept for comparison
+# ----------------------------------------------------------------------------
+
+class DictPlayer:
+    def __init__(self, player_id, username, score, timestamp=None):
+        self.player_id = player_id
+        self.username = username
+        self.score = score
+        self.timestamp = timestamp or datetime.now()
+
+
+class DictBSTNode:
+    def __init__(self, player):
+        self.player = player
+        self.left = None
+        self.right = None
+        self.height = 1
+        self.size = 1
+
+
+class DictUpdateRequest:
+    def __init__(self, player_id, new_score, timestamp=None):
+        self.player_id = player_id
+        self.new_score = new_score
+        self.timestamp = timestamp or datetime.now()
+        self.username = None
+
+
+def measure(build, count):
+    """
+    Return the bytes allocated per entry by build(i) for count entries.
+    The list holding the entries is measured separately and subtracted.
+    """
+    gc.collect()
+    tracemalloc.start()
+
+    holder = [None] * count
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    for i in range(count):
+        holder[i] = build(i)
+
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    del holder
+    gc.collect()
+    return used / count
+
+
+def run(count):
+    # ids, names and scores are shared by both layouts, so build them once
+    ids = [f"p{i:07d}" for i in range(count)]
+    names = [f"Player{i:07d}" for i in range(count)]
+    scores = [i * 7 % 100000 for i in range(count)]
+
+    rows = [
+        ("Player",
+         lambda i: DictPlayer(ids[i], names[i], scores[i]),
+         lambda i: Player(ids[i], names[i], scores[i])),
+        ("BSTNode (+ its Player)",
+         lambda i: DictBSTNode(DictPlayer(ids[i], names[i], scores[i])),
+         lambda i: BSTNode(Player(ids[i], names[i], scores[i]))),
+        ("UpdateRequest",
+         lambda i: DictUpdateRequest(ids[i], scores[i]),
+         lambda i: UpdateRequest(ids[i], scores[i])),
+    ]
+
+    print(f"\n--- Bytes per entry at {count:,} entries ---")
+    print(f"{'Object':<24} {'Before':>10} {'After':>10} {'Saved':>8}")
+
+    for name, before_build, after_build in rows:
+        before = measure(before_build, count)
+        after = measure(after_build, count)
+        print(f"{name:<24} {before:>10.1f} {after:>10.1f} {1 - after / before:>7.0%}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,203 @@
+"""
+Benchmark suite for the leaderboard engine.
+
+Times submit_score, process_updates, get_player_rank, get_leaderboard(top_n)
+and remove_player at several leaderboard sizes under adversarial update
+orders:
+    random       uniformly random scores
+    ascending    every score beats all earlier ones (always a new leader)
+    descending   every score is below all earlier ones
+    ties         scores drawn from 10 values, so ranks are decided by player_id
+    hot          1% of the players receive 90% of the updates
+
+Each case loads n players, then applies updates, queries and deletes (up
+to --ops of each), and reports nanoseconds per operation. Every case runs
+on each ranking engine given with --engines (default: all). Input is seeded,
+so runs are repeatable. Results are written as JSON together with the git
+commit, so two commits can be compared with --compare.
+
+Usage:
+    python benchmark_suite.py                               # 1k, 100k, 1M players
+    python benchmark_suite.py --sizes 1000 100000 --patterns random hot
+    python benchmark_suite.py --engines bst blocks --sizes 100000
+    python benchmark_suite.py --output new.json --compare old.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from leaderboard_system import RANKING_ENGINES, LeaderboardSystem
+
+PATTERNS = ("random", "ascending", "descending", "ties", "hot")
+OPERATIONS = ("load_submit", "load_process", "submit_score", "process_updates",
+              "get_rank", "get_top_n", "delete")
+
+
+def load_scores(pattern, count, rng):
+    """Scores for players 0..count-1, in submission order"""
+    if pattern == "ascending":
+        return list(range(count))
+    if pattern == "descending":
+        return list(range(count, 0, -1))
+    if pattern == "ties":
+        return [rng.randrange(10) for _ in range(count)]
+    return [rng.randrange(count * 10) for _ in range(count)]
+
+
+def update_stream(pattern, count, updates, rng):
+    """(player index, score) pairs for the update phase"""
+    if pattern == "ascending":
+        # each update makes a random player the new leader
+        return [(rng.randrange(count), count + i) for i in range(updates)]
+    if pattern == "descending":
+        # each update sends a random player to the bottom
+        return [(rng.randrange(count), -i) for i in range(updates)]
+    if pattern == "ties":
+        return [(rng.randrange(count), rng.randrange(10)) for _ in range(updates)]
+    if pattern == "hot":
+        hot = max(1, count // 100)
+        return [(rng.randrange(hot) if rng.random() < 0.9 else rng.randrange(count),
+                 rng.randrange(count * 10)) for _ in range(updates)]
+    return [(rng.randrange(count), rng.randrange(count * 10)) for _ in range(updates)]
+
+
+def timed(function, operations):
+    """Run function() and return nanoseconds per operation"""
+    gc.collect()
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1e9 / max(operations, 1)
+
+
+def run_case(engine, pattern, count, ops, seed):
+    """Benchmark one (engine, pattern, size) case; returns {operation: ns per op}"""
+    rng = random.Random(seed)
+    ids = [f"p{i}" for i in range(count)]
+    scores = load_scores(pattern, count, rng)
+    updates = update_stream(pattern, count, min(ops, count), rng)
+    queried = [ids[rng.randrange(count)] for _ in range(min(ops, count))]
+    deleted = rng.sample(ids, min(ops, count))
+
+    system = LeaderboardSystem(engine=engine)
+    results = {}
+
+    def load():
+        for player_id, score in zip(ids, scores):
+            system.submit_score(player_id, "Player", score)
+
+    def submit():
+        for index, score in updates:
+            system.submit_score(ids[index], "Player", score)
+
+    def ranks():
+        for player_id in queried:
+            system.get_player_rank(player_id)
+
+    def tops():
+        for _ in queried:
+            system.get_leaderboard(10)
+
+    def delete():
+        for player_id in deleted:
+            system.remove_player(player_id)
+
+    results["load_submit"] = timed(load, count)
+    results["load_process"] = timed(system.process_updates, count)
+    results["submit_score"] = timed(submit, len(updates))
+    results["process_updates"] = timed(system.process_updates, len(updates))
+    results["get_rank"] = timed(ranks, len(queried))
+    results["get_top_n"] = timed(tops, len(queried))
+    results["delete"] = timed(delete, len(deleted))
+    return results
+
+
+def git_commit():
+    """Current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(cases, baseline=None, file=sys.stdout):
+    """Print ns/op per case; with a baseline, also the ratio new/old"""
+    print(f"\n{'Engine':<7} {'Players':>9} {'Pattern':<11}" + "".join(f"{op:>17}" for op in OPERATIONS),
+          file=file)
+
+    old = {}
+    if baseline is not None:
+        # results from before engines were selectable ran on the bst
+        old = {(case.get("engine", "bst"), case["players"], case["pattern"]): case["ns_per_op"]
+               for case in baseline["cases"]}
+
+    for case in cases:
+        row = f"{case['engine']:<7} {case['players']:>9,} {case['pattern']:<11}"
+        previous = old.get((case["engine"], case["players"], case["pattern"]))
+
+        for op in OPERATIONS:
+            value = case["ns_per_op"][op]
+            if previous and op in previous:
+                row += f"{value:,.0f} ({value / previous[op]:.2f}x)".rjust(17)
+            else:
+                row += f"{value:>17,.0f}"
+        print(row, file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--patterns", nargs="+", choices=PATTERNS, default=list(PATTERNS))
+    parser.add_argument("--engines", nargs="+", choices=list(RANKING_ENGINES),
+                        default=list(RANKING_ENGINES))
+    parser.add_argument("--ops", type=int, default=100_000,
+                        help="updates / queries / deletes per case (capped at the size)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="JSON results file ('-' for stdout)")
+    parser.add_argument("--compare", help="earlier results file to show ratios against")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    cases = []
+    for count in args.sizes:
+        for pattern in args.patterns:
+            for engine in args.engines:
+                print(f"running {pattern} at {count:,} players on {engine}...", file=sys.stderr)
+                cases.append({"engine": engine, "players": count, "pattern": pattern,
+                              "ns_per_op": run_case(engine, pattern, count, args.ops, args.seed)})
+
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "ops": args.ops,
+        "seed": args.seed,
+        "cases": cases,
+    }
+
+    if args.output == "-":
+        # keep stdout pure JSON
+        print_table(cases, baseline, file=sys.stderr)
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        print_table(cases, baseline)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
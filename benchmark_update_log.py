@@ -0,0 +1,66 @@
+"""
+Update log benchmark: submit_score throughput with the write-ahead log
+off, on without fsync, and on with fsync at several group-commit sizes.
+
+Usage:
+    python benchmark_update_log.py            # 100,000 submissions
+    python benchmark_update_log.py 20000      # smaller run
+"""
+import os
+import sys
+import tempfile
+import time
+
+from leaderboard_system import LeaderboardSystem
+
+
+def submit_rate(count, log_path=None, flush_each=False, **log_options):
+    """
+    Submit count scores and return submissions per second.
+    flush_each=True commits after every submission, as a caller that must
+    not return before its update is durable would.
+    """
+    system = LeaderboardSystem()
+    if log_path is not None:
+        system.enable_update_log(log_path, **log_options)
+
+    start = time.perf_counter()
+    for i in range(count):
+        system.submit_score(f"p{i % 10000}", "Player", i)
+        if flush_each:
+            system.update_log.flush()
+    if system.update_log is not None:
+        system.update_log.flush()
+    elapsed = time.perf_counter() - start
+
+    if system.update_log is not None:
+        system.update_log.close()
+    return count / elapsed
+
+
+def run(count):
+    # (mode, log options or None for no log, submissions to time)
+    configs = [
+        ("no log", None, count),
+        ("log, no fsync", {"durable": False}, count),
+        # one fsync per update is slow enough that a smaller run suffices
+        ("fsync every update", {"flush_each": True}, min(count, 2000)),
+        ("fsync per 64", {"group_size": 64, "group_interval": 1}, count),
+        ("fsync per 1024", {"group_size": 1024, "group_interval": 1}, count),
+    ]
+
+    print(f"\n--- submit_score throughput ({count:,} submissions) ---")
+    print(f"{'Mode':<22} {'Updates/s':>12}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for i, (name, options, submissions) in enumerate(configs):
+            if options is None:
+                rate = submit_rate(submissions)
+            else:
+                path = os.path.join(directory, f"updates{i}.log")
+                rate = submit_rate(submissions, path, **options)
+            print(f"{name:<22} {rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
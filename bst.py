@@ -2,7 +2,8 @@
 Binary Search Tree implementation for storing players by score
 Rider Gordon
 """
-from player import Player
+from player import Player, ranking_key
+from ranking_engine import RankingEngine
 
 
 class BSTNode:
@@ -10,7 +11,9 @@ class BSTNode:
     Node in the Binary Search Tree.
     Each node stores a player and references to left and right children.
     """
-    
+
+    __slots__ = ("player", "left", "right", "height", "size")
+
     def __init__(self, player):
         """
         Initialize a BST node.
@@ -18,81 +21,98 @@ class BSTNode:
         self.player = player
         self.left = None
         self.right = None
+        self.height = 1  # height of the subtree rooted here (leaf = 1)
+        self.size = 1  # number of players in the subtree rooted here
 
 
-class BinarySearchTree:
+class BinarySearchTree(RankingEngine):
     """
     Binary Search Tree for storing player rankings.
     Players are ordered by score (high to low), with player_id as tiebreaker.
+
+    The tree is kept balanced as an AVL tree: after every insert and delete
+    the nodes on the changed path are rotated so the heights of any node's
+    two subtrees differ by at most one. The height is therefore O(log n) no
+    matter what order the scores arrive in (e.g. rising tournament scores),
+    and so is the recursion depth of every helper below.
     """
     
     def __init__(self):
         self.root = None
         self.size = 0
+        self.hooks = None  # HookRegistry while tracers are attached (see hooks.py)
 
     def insert(self, player):
         """
         Insert a player into the BST.
+        Time Complexity: O(log n)
         """
-        # Initial empty tree - new player becomes the root
-        if self.root is None:
-            self.root = BSTNode(player)
-            self.size += 1
-            return self.root
+        hooks = self.hooks
+        if hooks is not None:
+            hooks.begin("bst.insert")
 
-        # The tree has nodes - insert recursively
-        new_node = self.insert_recursively(self.root, player)
-        self.size += 1
-        return new_node
+        try:
+            new_node = BSTNode(player)
+            self.root = self.insert_recursively(self.root, new_node)
+            self.size += 1
+            return new_node
+        finally:
+            if hooks is not None:
+                hooks.end("bst.insert")
 
-    def insert_recursively(self, node, player):
+    def insert_recursively(self, node, new_node):
         """
-        Insert into the BST tree recursively
+        Insert into the BST tree recursively.
+        Returns the (possibly rotated) root of this subtree.
         """
         if node is None:
-            return BSTNode(player)
+            return new_node
 
-        if player < node.player:
+        if new_node.player < node.player:
             # if the new player has lower score  go left
-            if node.left is None:
-                node.left = BSTNode(player)
-                return node.left
-            else:
-                return self.insert_recursively(node.left, player)
+            node.left = self.insert_recursively(node.left, new_node)
         else:
             # if the new player has higher score, go right
-            if node.right is None:
-                node.right = BSTNode(player)
-                return node.right
-            else:
-                return self.insert_recursively(node.right, player)
+            node.right = self.insert_recursively(node.right, new_node)
 
-    def delete(self, player_id):
+        return self.rebalance(node)
+
+    def delete_player(self, player):
         """
-        Delete a player from the BST by player_id.
+        Delete a player from the BST, descending by (score, player_id).
+        The player must carry the score it was inserted with.
+        Time Complexity: O(log n)
         """
-        # Check if player exists first
-        if self.search(player_id) is None:
-            return False
-
-        # delete recursively
-        self.root = self.delete_recursively(self.root, player_id)
-        self.size -= 1
-        return True
-
-    def delete_recursively(self, node, player_id):
-        #recursive deletion
+        hooks = self.hooks
+        if hooks is not None:
+            hooks.begin("bst.delete")
+
+        try:
+            if self.find_node(player) is None:
+                return False
+
+            # delete recursively
+            self.root = self.delete_recursively(self.root, player)
+            self.size -= 1
+            return True
+        finally:
+            if hooks is not None:
+                hooks.end("bst.delete")
+
+    def delete_recursively(self, node, player):
+        #recursive deletion, following the same ordering as insert
         if node is None:
             return None
 
-        # Found the node to delete
-        if node.player.player_id == player_id:
-            #Leaf node (no children)
-            if node.left is None and node.right is None:
-                return None
+        if player < node.player:
+            node.left = self.delete_recursively(node.left, player)
+        elif node.player < player:
+            node.right = self.delete_recursively(node.right, player)
 
-            #Only right child
-            elif node.left is None:
+        # Found the node to delete
+        else:
+            #Only right child (or leaf)
+            if node.left is None:
                 return node.right
 
             #Only left child
@@ -108,13 +128,184 @@ class BinarySearchTree:
                 node.player = successor.player
 
                 # Delete the successor from the right subtree
-                node.right = self.delete_recursively(node.right, successor.player.player_id)
+                node.right = self.delete_recursively(node.right, successor.player)
 
+        return self.rebalance(node)
+
+    def find_node(self, player):
+        """
+        Find the node holding a player by descending on (score, player_id).
+        Time Complexity: O(log n)
+        """
+        node = self.root
+        while node is not None:
+            if player < node.player:
+                node = node.left
+            elif node.player < player:
+                node = node.right
+            else:
                 return node
+        return None
+
+    def update_player_score(self, player, new_score):
+        """
+        Change the score of a player already in the tree, in place.
+        The same Player object is kept. If the new score leaves the player
+        between the same two neighbours, only the score changes and the tree
+        is not restructured; otherwise the player is moved to its new position.
+        Time Complexity: O(log n)
+        """
+        hooks = self.hooks
+        if hooks is not None:
+            hooks.begin("bst.update")
+
+        try:
+            if self.find_node(player) is None:
+                return False
+
+            lower, higher = self.neighbours(player)
+
+            old_score = player.score
+            player.score = new_score
+
+            # Same neighbours → the ordering is unchanged, nothing to move
+            if (lower is None or lower < player) and (higher is None or player < higher):
+                return True
+
+            # Take the player out under its old key and re-insert it
+            player.score = old_score
+            self.root = self.delete_recursively(self.root, player)
+            player.score = new_score
+            self.root = self.insert_recursively(self.root, BSTNode(player))
+            return True
+        finally:
+            if hooks is not None:
+                hooks.end("bst.update")
+
+    def neighbours(self, player):
+        """
+        Get the players just below and just above a player in the ordering,
+        as (lower, higher). Either is None at the ends of the leaderboard.
+        Time Complexity: O(log n)
+        """
+        lower = None
+        higher = None
+        node = self.root
+
+        while node is not None:
+            if player < node.player:
+                higher = node.player
+                node = node.left
+            elif node.player < player:
+                lower = node.player
+                node = node.right
+            else:
+                # the closest players are the extremes of the child subtrees
+                if node.left is not None:
+                    lower = self.find_max(node.left).player
+                if node.right is not None:
+                    higher = self.find_min(node.right).player
+                break
+
+        return lower, higher
 
-        # Not found at this node, search both subtrees
-        node.left = self.delete_recursively(node.left, player_id)
-        node.right = self.delete_recursively(node.right, player_id)
+    def bulk_load(self, players, presorted=False):
+        """
+        Replace the tree's contents with players, building a perfectly
+        balanced tree directly instead of inserting one at a time.
+        Player ids must be unique. Pass presorted=True if players are already
+        in ascending (score, player_id) order to skip the sort.
+        Time Complexity: O(n) presorted, O(n log n) otherwise
+        """
+        if presorted:
+            players = list(players)
+        else:
+            players = sorted(players, key=ranking_key)
+
+        self.root = self.build_balanced(players, 0, len(players))
+        self.size = len(players)
+
+    def build_balanced(self, players, start, end):
+        """
+        Build a balanced subtree from the sorted slice players[start:end].
+        The middle player becomes the root, so recursion depth is O(log n).
+        """
+        if start >= end:
+            return None
+
+        middle = (start + end) // 2
+        node = BSTNode(players[middle])
+
+        # only recurse into non-empty halves - half the calls would be leaves' children
+        if start < middle:
+            node.left = self.build_balanced(players, start, middle)
+        if middle + 1 < end:
+            node.right = self.build_balanced(players, middle + 1, end)
+
+        # splitting at the middle gives a complete-height subtree, so the
+        # size and height follow from the slice length alone
+        node.size = end - start
+        node.height = node.size.bit_length()
+        return node
+
+    def height(self, node):
+        """Height of a subtree (0 for an empty subtree)"""
+        if node is None:
+            return 0
+        return node.height
+
+    def subtree_size(self, node):
+        """Number of players in a subtree (0 for an empty subtree)"""
+        if node is None:
+            return 0
+        return node.size
+
+    def update_node(self, node):
+        """Recompute a node's height and subtree size from its children"""
+        node.height = 1 + max(self.height(node.left), self.height(node.right))
+        node.size = 1 + self.subtree_size(node.left) + self.subtree_size(node.right)
+
+    def rotate_left(self, node):
+        """
+        Rotate left around node and return the new subtree root.
+        """
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        self.update_node(node)
+        self.update_node(pivot)
+        return pivot
+
+    def rotate_right(self, node):
+        """
+        Rotate right around node and return the new subtree root.
+        """
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        self.update_node(node)
+        self.update_node(pivot)
+        return pivot
+
+    def rebalance(self, node):
+        """
+        Restore the AVL property at node after one of its subtrees changed.
+        Returns the new root of this subtree.
+        """
+        self.update_node(node)
+        balance = self.height(node.left) - self.height(node.right)
+
+        # Left side too tall
+        if balance > 1:
+            if self.height(node.left.left) < self.height(node.left.right):
+                node.left = self.rotate_left(node.left)  # left-right case
+            return self.rotate_right(node)
+
+        # Right side too tall
+        if balance < -1:
+            if self.height(node.right.right) < self.height(node.right.left):
+                node.right = self.rotate_right(node.right)  # right-left case
+            return self.rotate_left(node)
 
         return node
 
@@ -127,11 +318,28 @@ class BinarySearchTree:
             current = current.left
         return current
 
+    def find_max(self, node):
+        """
+        Find the node with maximum value in a subtree.
+        """
+        current = node
+        while current.right is not None:
+            current = current.right
+        return current
+
     def search(self, player_id):
         """
         Search for a player by player_id.
         """
-        return self.search_recursively(self.root, player_id)
+        hooks = self.hooks
+        if hooks is None:
+            return self.search_recursively(self.root, player_id)
+
+        hooks.begin("bst.search")
+        try:
+            return self.search_recursively(self.root, player_id)
+        finally:
+            hooks.end("bst.search")
 
     def search_recursively(self, node, player_id):
         """
@@ -149,84 +357,174 @@ class BinarySearchTree:
 
         return self.search_recursively(node.right, player_id)
 
-    def inorder_traversal(self):
+    def iter_ascending(self):
         """
-        Perform in-order traversal of the tree.
-        this returns players in low to high score.
+        Lazily yield players from low to high score.
+        Uses an explicit stack instead of recursion.
         """
-        result = []
-        self.inorder_recursively(self.root, result)
-        return result
+        stack = []
+        node = self.root
 
-    def inorder_recursively(self, node, result):
+        while stack or node is not None:
+            # walk as far left (lower scores) as possible
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+            node = stack.pop()
+            yield node.player
+            node = node.right
+
+    def iter_range(self, offset, limit=None):
         """
-        helper function for in-order traversal.
+        Lazily yield up to limit players in rank order, skipping the first
+        offset players (offset 0 starts at rank 1).
+        Uses the subtree sizes to jump straight to the starting rank, so a
+        page costs O(log n + limit) rather than a walk over the skipped players.
         """
-        if node is None:
+        if limit is not None and limit <= 0:
             return
 
-        self.inorder_recursively(node.left, result)
-        result.append(node.player)
-        self.inorder_recursively(node.right, result)
+        # Build the reverse in-order stack for the player at index offset.
+        # Only nodes that still have to be yielded are pushed.
+        stack = []
+        node = self.root
+        while node is not None:
+            right_size = self.subtree_size(node.right)
+            if offset < right_size:
+                stack.append(node)
+                node = node.right
+            elif offset == right_size:
+                stack.append(node)
+                break
+            else:
+                offset -= right_size + 1
+                node = node.left
 
-    def reverse_inorder_traversal(self):
-        """
-        This returns players in order  of high to low score.
-        This is what we want for  our leaderboard
-        """
-        result = []
-        self.reverse_inorder_recursively(self.root, result)
-        return result
+        yielded = 0
+        while stack:
+            node = stack.pop()
+            yield node.player
+
+            yielded += 1
+            if limit is not None and yielded >= limit:
+                return
+
+            # next in rank order: the highest player of the left subtree
+            node = node.left
+            while node is not None:
+                stack.append(node)
+                node = node.right
 
-    def reverse_inorder_recursively(self, node, result):
+    def count_ahead(self, player):
         """
-        helper function for reverse in-order traversal.
+        Count the players ranked strictly above the given player's
+        (score, player_id) position. The player does not need to be in the tree.
+        Time Complexity: O(log n) using the subtree sizes
         """
-        if node is None:
-            return
+        ahead = 0
+        node = self.root
+
+        while node is not None:
+            if player < node.player:
+                # this node and everything to its right rank higher
+                ahead += 1 + self.subtree_size(node.right)
+                node = node.left
+            elif node.player < player:
+                node = node.right
+            else:
+                # same position - only the right subtree ranks higher
+                ahead += self.subtree_size(node.right)
+                break
 
-        self.reverse_inorder_recursively(node.right, result)  # Higher scores first
-        result.append(node.player)
-        self.reverse_inorder_recursively(node.left, result)  # Lower scores last
+        return ahead
 
-    def get_leaderboard(self):
+    def rank_of_player(self, player):
         """
-        Get the leaderboard
+        Get the rank (1 = highest score) of a player already in the tree.
+        Time Complexity: O(log n)
         """
-        return self.reverse_inorder_traversal()
+        ahead = 0
+        node = self.root
+
+        while node is not None:
+            if player < node.player:
+                ahead += 1 + self.subtree_size(node.right)
+                node = node.left
+            elif node.player < player:
+                node = node.right
+            else:
+                return ahead + self.subtree_size(node.right) + 1
 
-    def get_top_n(self, n):
+        # Player not found
+        return -1
+
+    def player_at_rank(self, rank):
         """
-        Get the top N players with highest scores.
+        Get the player holding a given rank (1 = highest score).
+        Returns None if the rank is out of range.
+        Time Complexity: O(log n)
         """
-        ranked_players = self.get_leaderboard()
+        if rank < 1 or rank > self.size:
+            return None
 
-        # Return only the first N players
-        return ranked_players[:n]
+        node = self.root
+        while node is not None:
+            right_size = self.subtree_size(node.right)
+            if rank <= right_size:
+                node = node.right
+            elif rank == right_size + 1:
+                return node.player
+            else:
+                rank -= right_size + 1
+                node = node.left
+
+        return None
 
-    def get_rank(self, player_id):
+    def count_below(self, score):
         """
-        Get the rank of a player.
+        Count the players whose score is strictly lower than score.
+        Time Complexity: O(log n)
         """
-        # Get all players in order of high to low
-        ranked_players = self.get_leaderboard()
-
-        # Find the player's position
-        for rank, player in enumerate(ranked_players, 1):
-            if player.player_id == player_id:
-                return rank
+        count = 0
+        node = self.root
+        while node is not None:
+            if node.player.score < score:
+                # this node and its whole left subtree are below
+                count += 1 + self.subtree_size(node.left)
+                node = node.right
+            else:
+                node = node.left
+        return count
 
-        # Player not found
-        return -1
+    def count_above(self, score):
+        """
+        Count the players whose score is strictly higher than score.
+        Time Complexity: O(log n)
+        """
+        count = 0
+        node = self.root
+        while node is not None:
+            if node.player.score > score:
+                # this node and its whole right subtree are above
+                count += 1 + self.subtree_size(node.right)
+                node = node.left
+            else:
+                node = node.right
+        return count
 
     def is_empty(self):
         """Check if tree is empty"""
         return self.root is None
     
-    def get_size(self):
-        """Get number of players in tree"""
-        return self.size
-    
+    def get_shape(self):
+        """Tree height against the height of a perfectly balanced tree"""
+        return {
+            'size': self.size,
+            'height': self.height(self.root),
+            'min_height': self.size.bit_length(),
+        }
+
     def clear(self):
         """Remove all players from the tree"""
         self.root = None
@@ -0,0 +1,296 @@
+"""
+Concurrent leaderboard: many submitting threads, one apply worker, and
+readers that never see a half-applied update.
+"""
+import threading
+from contextlib import contextmanager
+
+from leaderboard_system import LeaderboardSystem
+from FIFO_Queue import ConcurrentFIFOQueue, FIFOQueueList
+from event_log import EventLog
+
+
+class ReadWriteLock:
+    """
+    Lock that lets many readers in at once but gives a writer exclusive access.
+    Waiting writers are preferred so a stream of readers cannot starve them.
+    The lock is not reentrant.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition(threading.Lock())
+        self.readers = 0  # readers currently holding the lock
+        self.writer = False  # is a writer holding the lock
+        self.writers_waiting = 0
+
+    def acquire_read(self):
+        """Block until no writer holds or is waiting for the lock"""
+        with self.condition:
+            self.condition.wait_for(lambda: not self.writer and self.writers_waiting == 0)
+            self.readers += 1
+
+    def release_read(self):
+        with self.condition:
+            self.readers -= 1
+            if self.readers == 0:
+                self.condition.notify_all()
+
+    def acquire_write(self):
+        """Block until no reader or writer holds the lock"""
+        with self.condition:
+            self.writers_waiting += 1
+            self.condition.wait_for(lambda: not self.writer and self.readers == 0)
+            self.writers_waiting -= 1
+            self.writer = True
+
+    def release_write(self):
+        with self.condition:
+            self.writer = False
+            self.condition.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ConcurrentLeaderboardSystem(LeaderboardSystem):
+    """
+    LeaderboardSystem that is safe to use from many threads.
+
+    Design:
+    1. Any thread may submit_score → thread-safe ConcurrentFIFOQueue
+    2. A background worker drains the queue in batches
+    3. Each batch is dequeued and applied under the write lock, so readers
+       (get_leaderboard, get_player_rank, ...) see either the old or the
+       new state of a player, never a player missing from the BST, and a
+       snapshot never misses updates that are out of the queue but not
+       yet applied
+
+    Call start() to launch the worker and stop() to shut it down. flush()
+    waits until everything submitted before the call has been applied.
+    """
+
+    def __init__(self, batch_size=64, queue_max_size=None, overflow_policy=FIFOQueueList.REJECT,
+                 log_level=EventLog.SILENT, engine="bst"):
+        """
+        Initialize the concurrent leaderboard system.
+        batch_size caps how many updates the worker applies per write lock.
+        """
+        super().__init__(queue_max_size, overflow_policy, log_level, engine)
+
+        self.update_queue = ConcurrentFIFOQueue(max_size=queue_max_size,
+                                                overflow_policy=overflow_policy)
+        self.rw_lock = ReadWriteLock()
+        # serializes submitters: keeps the log in queue order and lets a
+        # snapshot see the queue, log position and total_updates together
+        self.counter_lock = threading.Lock()
+
+        self.batch_size = batch_size
+        self.worker = None
+        self.running = False
+
+    def start(self):
+        """Start the background apply worker"""
+        if self.worker is not None:
+            return
+
+        self.running = True
+        self.worker = threading.Thread(target=self.worker_loop,
+                                       name="leaderboard-apply-worker", daemon=True)
+        self.worker.start()
+
+    def stop(self, drain=True):
+        """
+        Stop the background worker. With drain=True, pending updates are
+        applied first.
+        """
+        if self.worker is None:
+            return
+
+        if drain:
+            self.flush()
+
+        self.running = False
+        self.worker.join()
+        self.worker = None
+
+    def worker_loop(self):
+        """
+        Continuously drain the queue, taking and applying each batch under
+        the write lock.
+        """
+        while self.running:
+            # wait outside the lock so an idle worker does not hold off
+            # readers; a short timeout lets the loop notice stop()
+            if not self.update_queue.wait_not_empty(timeout=0.05):
+                continue
+
+            # each batch is one LeaderboardSystem.process_updates call, so it
+            # commits the log first and runs the hooks and processing events;
+            # task_done is called by apply_pending
+            with self.rw_lock.write_locked():
+                super().process_updates(max_items=self.batch_size)
+
+    def flush(self, timeout=None):
+        """
+        Wait until every update submitted before the call has been applied
+        (or dropped by a bounded queue). Updates submitted meanwhile are not
+        waited for, so this returns even while producers outpace the worker.
+        Returns False if the timeout expired first.
+        """
+        return self.update_queue.join_enqueued(timeout)
+
+    def accept_update(self, update):
+        """
+        Queue and log a submitted update. Safe to call from any thread.
+
+        The enqueue and log append happen together under counter_lock. With
+        the "block" policy the wait for room happens before taking the lock:
+        a submitter blocked while holding it would stall save_snapshot, and
+        the snapshot's read lock would in turn stall the worker that has to
+        make room.
+        """
+        queue = self.update_queue
+        blocking = queue.overflow_policy == FIFOQueueList.BLOCK
+
+        while True:
+            if blocking:
+                queue.wait_not_full()
+
+            with self.counter_lock:
+                # only lock holders enqueue, so room seen here is still there
+                # when super() enqueues; otherwise another submitter won it
+                if not blocking or not queue.is_full():
+                    return super().accept_update(update)
+
+    def process_updates(self, coalesce=False, max_items=None, max_seconds=None):
+        """
+        Apply pending updates. While the worker is running this just waits
+        for it to catch up (the budgets do not apply); otherwise the queue is
+        drained on this thread under the write lock, within the budgets.
+        Returns (applied, remaining) like LeaderboardSystem.process_updates.
+        """
+        if max_items is not None and max_items < 1:
+            raise ValueError("max_items must be at least 1")
+
+        if self.worker is not None:
+            self.flush()
+            return 0, self.update_queue.get_size()
+
+        with self.rw_lock.write_locked():
+            return super().process_updates(coalesce, max_items, max_seconds)
+
+    def apply_pending(self, coalesce, max_items, max_seconds):
+        """Body of process_updates; the caller holds the write lock"""
+        # every dequeued update (coalesced or not) bumps updates_processed
+        dequeued_before = self.updates_processed
+        result = super().apply_pending(coalesce, max_items, max_seconds)
+        self.update_queue.task_done(self.updates_processed - dequeued_before)
+        return result
+
+    def submit_scores_batch(self, player_ids, scores, usernames=None):
+        """
+        Apply a batch of scores (see LeaderboardSystem.submit_scores_batch)
+        under the write lock. Holding counter_lock too keeps submitters out,
+        so the updates already queued are applied here first, rather than
+        waited for, and the batch is logged and applied right after them.
+        """
+        with self.rw_lock.write_locked(), self.counter_lock:
+            return super().submit_scores_batch(player_ids, scores, usernames)
+
+    # ------------------------------------------------------------------
+    # Readers - shared lock
+    #
+    # Updates change Player objects in place, so readers return copies
+    # taken under the lock; the worker cannot change them after return.
+    # ------------------------------------------------------------------
+
+    def get_leaderboard(self, top_n=None):
+        with self.rw_lock.read_locked():
+            return [player.copy() for player in super().get_leaderboard(top_n)]
+
+    def get_leaderboard_page(self, offset, limit):
+        with self.rw_lock.read_locked():
+            return [player.copy() for player in super().get_leaderboard_page(offset, limit)]
+
+    def get_player_rank(self, player_id):
+        with self.rw_lock.read_locked():
+            return super().get_player_rank(player_id)
+
+    def get_player_at_rank(self, rank):
+        with self.rw_lock.read_locked():
+            player = super().get_player_at_rank(rank)
+            return player.copy() if player is not None else None
+
+    def get_players_in_score_range(self, low, high):
+        with self.rw_lock.read_locked():
+            return [player.copy() for player in super().get_players_in_score_range(low, high)]
+
+    def count_players_in_score_range(self, low, high):
+        with self.rw_lock.read_locked():
+            return super().count_players_in_score_range(low, high)
+
+    def count_players_above(self, score):
+        with self.rw_lock.read_locked():
+            return super().count_players_above(score)
+
+    def get_score_percentile(self, percentile):
+        with self.rw_lock.read_locked():
+            return super().get_score_percentile(percentile)
+
+    def get_player(self, player_id):
+        with self.rw_lock.read_locked():
+            player = super().get_player(player_id)
+            return player.copy() if player is not None else None
+
+    def get_stats(self):
+        with self.rw_lock.read_locked():
+            return super().get_stats()
+
+    def get_metrics(self):
+        with self.rw_lock.read_locked():
+            return super().get_metrics()
+
+    # ------------------------------------------------------------------
+    # Other writers - exclusive lock
+    # ------------------------------------------------------------------
+
+    # remove_player and import_players log at their place in the queue
+    # order, so they hold off submitters like clear_leaderboard does
+
+    def remove_player(self, player_id):
+        with self.rw_lock.write_locked(), self.counter_lock:
+            return super().remove_player(player_id)
+
+    def clear_leaderboard(self):
+        with self.rw_lock.write_locked(), self.counter_lock:
+            super().clear_leaderboard()
+
+    def import_players(self, records):
+        with self.rw_lock.write_locked(), self.counter_lock:
+            return super().import_players(records)
+
+    # Lock order: rw_lock, then counter_lock, then the queue's lock.
+    # Submitters never wait while holding counter_lock (see accept_update).
+
+    def save_snapshot(self, path, truncate_log=True):
+        # hold off submitters too, so the log position matches the queue
+        with self.rw_lock.read_locked(), self.counter_lock:
+            super().save_snapshot(path, truncate_log)
+
+    def restore_snapshot(self, path):
+        # restore refills the queue and resets the counters submitters use
+        with self.rw_lock.write_locked(), self.counter_lock:
+            super().restore_snapshot(path)
@@ -0,0 +1,57 @@
+"""
+Event log for the leaderboard system.
+Replaces print calls on the hot paths with leveled, lazily formatted events
+so library use is silent and throughput measures the data structures.
+"""
+
+
+class EventLog:
+    """
+    Leveled event sink with per-event counters.
+
+    Levels (each includes the ones above it):
+    - SILENT: do nothing (default)
+    - COUNTERS: only count events by name
+    - INFO: also output batch-level events (e.g. "Processed 100 updates")
+    - DEBUG: also output per-update events (e.g. every queued score)
+
+    Messages are str.format templates that are only formatted when they
+    are actually output, so disabled events cost a method call.
+    """
+
+    SILENT = 0
+    COUNTERS = 1
+    INFO = 2
+    DEBUG = 3
+
+    def __init__(self, level=SILENT, sink=print):
+        """
+        Initialize the event log.
+        sink is called with each formatted message (print by default; a
+        logging.Logger's info method works too).
+        """
+        self.level = level
+        self.sink = sink
+        self.counts = {}  # event name → number of times emitted
+
+    def emit(self, level, event, message, *args):
+        """
+        Record an event and output it if the log level includes it.
+        """
+        if self.level < self.COUNTERS:
+            return
+
+        self.counts[event] = self.counts.get(event, 0) + 1
+
+        if self.level >= level:
+            self.sink(message.format(*args))
+
+    def info(self, event, message, *args):
+        self.emit(self.INFO, event, message, *args)
+
+    def debug(self, event, message, *args):
+        self.emit(self.DEBUG, event, message, *args)
+
+    def reset_counts(self):
+        """Forget all event counts"""
+        self.counts = {}
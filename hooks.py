@@ -0,0 +1,106 @@
+"""
+Hook surface for tracers and profilers on tree and queue operations.
+
+The ranking engines, FIFOQueueList and LeaderboardSystem each have a
+hooks attribute that is None unless a tracer is attached, so with no hooks
+an instrumented operation costs one attribute check. When set, it is a
+HookRegistry whose begin(operation) / end(operation) calls surround:
+    bst.insert, bst.delete, bst.update, bst.search
+        (blocks.* for the SortedBlockList engine),
+    queue.dequeue, system.process_updates
+"""
+import json
+import os
+import threading
+import time
+
+
+class Hook:
+    """
+    Base class for hooks. Override begin and/or end; both receive the
+    operation name. end is called even if the operation raised.
+    """
+
+    def begin(self, operation):
+        pass
+
+    def end(self, operation):
+        pass
+
+
+class HookRegistry:
+    """
+    The hooks attached to a system. Hooks are called in the order they were
+    added on begin and in reverse order on end, so they nest properly.
+    """
+
+    def __init__(self):
+        self.hooks = []
+
+    def add(self, hook):
+        self.hooks.append(hook)
+
+    def remove(self, hook):
+        self.hooks.remove(hook)
+
+    def __len__(self):
+        return len(self.hooks)
+
+    def begin(self, operation):
+        for hook in self.hooks:
+            hook.begin(operation)
+
+    def end(self, operation):
+        for hook in reversed(self.hooks):
+            hook.end(operation)
+
+
+class ChromeTraceHook(Hook):
+    """
+    Records every hooked operation as a Chrome trace "complete" event and
+    writes them as JSON, to open in chrome://tracing or Perfetto for
+    offline flame analysis.
+
+    Spans are tracked per thread, so worker threads show up as separate
+    tracks. Recording stops after max_events events (counted in dropped)
+    so a long run cannot exhaust memory; call write() to save the trace.
+    """
+
+    def __init__(self, path, max_events=1_000_000):
+        self.path = path
+        self.max_events = max_events
+        self.events = []
+        self.dropped = 0
+
+        self.origin = time.perf_counter_ns()
+        self.local = threading.local()  # per-thread stack of span start times
+
+    def begin(self, operation):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        stack.append(time.perf_counter_ns())
+
+    def end(self, operation):
+        end = time.perf_counter_ns()
+        start = self.local.stack.pop()
+
+        if len(self.events) >= self.max_events:
+            self.dropped += 1
+            return
+
+        # Chrome trace timestamps and durations are in microseconds
+        self.events.append({
+            "name": operation,
+            "cat": operation.split(".", 1)[0],
+            "ph": "X",
+            "ts": (start - self.origin) / 1000,
+            "dur": (end - start) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        })
+
+    def write(self):
+        """Write the recorded events to path"""
+        with open(self.path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ns"}, f)
@@ -2,10 +2,27 @@
 Real-Time Multiplayer Leaderboard System
 Srinivas Krishnan
 """
+import heapq
+import time
+
 from bst import BinarySearchTree
-from player import Player
+from sorted_blocks import SortedBlockList
+from player import Player, ranking_key
 from FIFO_Queue import FIFOQueueList, UpdateRequest
-from datetime import datetime
+from event_log import EventLog
+from snapshot import read_snapshot, write_snapshot
+from update_log import UpdateLog, check_update, OP_REMOVE, OP_CLEAR
+from page_cache import PageCache
+from metrics import Metrics
+from hooks import HookRegistry
+from batch_ingest import prepare_batch
+
+
+# ranking engines selectable with LeaderboardSystem(engine=...)
+RANKING_ENGINES = {
+    "bst": BinarySearchTree,
+    "blocks": SortedBlockList,
+}
 
 
 class LeaderboardSystem:
@@ -24,88 +41,602 @@ class LeaderboardSystem:
     - O(log n) BST operations
     """
 
-    def __init__(self):
-        """Initialize the leaderboard system"""
+    def __init__(self, queue_max_size=None, overflow_policy=FIFOQueueList.REJECT,
+                 log_level=EventLog.SILENT, engine="bst"):
+        """
+        Initialize the leaderboard system.
+        queue_max_size bounds the pending update queue (None = unbounded) and
+        overflow_policy picks what happens when it is full (see FIFOQueueList).
+        log_level controls event output (see EventLog); silent by default.
+        engine picks the ranking engine (see RANKING_ENGINES): "bst" for the
+        AVL tree, "blocks" for the sorted block list suited to read-heavy boards.
+        """
+        if engine not in RANKING_ENGINES:
+            raise ValueError(f"Unknown ranking engine: {engine}")
+
+        self.events = EventLog(log_level)
+
         # Core data structures
-        self.bst = BinarySearchTree()  # Rankings storage
-        self.update_queue = FIFOQueueList()  # Pending updates
+        self.engine = RANKING_ENGINES[engine]()  # Rankings storage (a RankingEngine)
+        self.update_queue = FIFOQueueList(max_size=queue_max_size,
+                                          overflow_policy=overflow_policy)  # Pending updates
         self.player_lookup = {}  # player_id → Player
 
         # Statistics
         self.total_updates = 0
         self.updates_processed = 0
+        self.updates_coalesced = 0  # superseded before reaching the BST
+
+        # Optional write-ahead log (see enable_update_log)
+        self.update_log = None
+        self.log_position = 0  # sequence number of the last logged update
+
+        # Optional cache of top-N / page results (see enable_page_cache)
+        self.page_cache = None
+
+        # Optional latency / queue-lag instrumentation (see enable_metrics)
+        self.metrics = None
+
+        # Tracer hooks, shared with the ranking engine and the queue (see add_hook)
+        self.hooks = None
+
+    @property
+    def bst(self):
+        """
+        The ranking engine under its name from before engines were
+        pluggable, kept so existing callers of system.bst keep working.
+        """
+        return self.engine
 
     def submit_score(self, player_id, username, score):
         """
         Submit a score update for a player.
         The update is placed in the queued for processing.
+        Returns False if a bounded queue is full and rejected the update.
+        With the update log enabled, raises ValueError if the update cannot
+        be logged (see update_log.check_update).
         Time Complexity: O(1) - just enqueues
         """
-        update = UpdateRequest(player_id, score)
-        update.username = username  # Store username in update
-        self.update_queue.enqueue(update)
+        return self.accept_update(UpdateRequest(player_id, score, username=username))
+
+    def accept_update(self, update):
+        """
+        Queue a submitted update and, if the update log is enabled, log it.
+        Every submission front-end goes through here so the queue, the log
+        and total_updates stay in step.
+        Returns False if a bounded queue rejected the update; raises
+        ValueError, before anything is queued, if it cannot be logged.
+        Time Complexity: O(1)
+        """
+        if self.update_log is not None:
+            check_update(update)
+
+        if not self.update_queue.enqueue(update):
+            self.events.debug("score_rejected", "Rejected update (queue full): {} ({}) -> {}",
+                              update.username, update.player_id, update.new_score)
+            return False
+
+        if self.update_log is not None:
+            self.log_position = self.update_log.append(update)
+
         self.total_updates += 1
 
-        print(f"Queued update: {username} ({player_id}) -> {score}")
+        self.events.debug("score_queued", "Queued update: {} ({}) -> {}",
+                          update.username, update.player_id, update.new_score)
+        return True
 
-    def process_updates(self):
+    def process_updates(self, coalesce=False, max_items=None, max_seconds=None):
         """
         Process pending updates from the queue.
         Updates are applied to BST in FIFO order.
-        Time Complexity: O(log n) , where n = total players
+
+        max_items and max_seconds put a budget on one call so a large
+        backlog can be drained incrementally between reads; whatever is left
+        stays queued for the next call. At least one update is applied per
+        call when any are pending (max_items must be at least 1).
+
+        With coalesce=True the updates taken from the queue (all of them, or
+        up to the budget) are collapsed so only the last one per player is
+        applied. The final leaderboard is the same as applying every update
+        in order, but superseded scores never touch the BST. The time budget
+        is checked while taking updates from the queue.
+
+        Returns (applied, remaining): updates applied by this call and
+        updates still waiting in the queue.
+        Time Complexity: O(log n) per update, where n = total players
         """
+        if max_items is not None and max_items < 1:
+            raise ValueError("max_items must be at least 1")
+
+        hooks = self.hooks
+        if hooks is None:
+            return self.apply_pending(coalesce, max_items, max_seconds)
+
+        hooks.begin("system.process_updates")
+        try:
+            return self.apply_pending(coalesce, max_items, max_seconds)
+        finally:
+            hooks.end("system.process_updates")
+
+    def apply_pending(self, coalesce, max_items, max_seconds):
+        """Body of process_updates"""
         processed = 0
+        deadline = None if max_seconds is None else time.perf_counter() + max_seconds
+
+        self.events.info("processing_started", "\nProcessing updates...")
 
-        print(f"\nProcessing updates...")
+        # commit any logged group before applying, so everything processed
+        # is durable even if submissions have paused
+        if self.update_log is not None:
+            self.update_log.flush()
 
-        while not self.update_queue.is_empty():
+        if coalesce:
+            updates = self.drain_coalesced(max_items, deadline)
+        else:
+            updates = self.drain(max_items, deadline)
+
+        for update in updates:
+            self.process_update(update)
+            processed += 1
+
+        remaining = self.update_queue.get_size()
+
+        if processed > 0:
+            self.events.info("processing_finished", "Processed {} updates ({} remaining)",
+                             processed, remaining)
+        else:
+            self.events.info("processing_finished", "No updates to process")
 
+        return processed, remaining
+
+    def process_update(self, update):
+        """
+        Apply one dequeued update and count it as processed, with its debug
+        event. Drain loops outside process_updates apply updates through here.
+        Returns the player's previous score, or None for a new player.
+        """
+        old_score = self.apply_update(update)
+
+        if old_score is not None:
+            self.events.debug("player_updated", "  Updated: {} {} -> {}",
+                              update.username, old_score, update.new_score)
+        else:
+            # New player
+            self.events.debug("player_added", "  Added: {} -> {}", update.username, update.new_score)
+
+        self.updates_processed += 1
+        return old_score
+
+    def drain(self, max_items=None, deadline=None):
+        """
+        Yield queued updates in FIFO order until the queue is empty, max_items
+        have been taken, or time.perf_counter() passes deadline.
+        Updates are dequeued one at a time, as the caller applies them.
+        """
+        taken = 0
+
+        while max_items is None or taken < max_items:
             # Dequeue next update (FIFO order)
             update = self.update_queue.dequeue()
+            if update is None:
+                return
+
+            yield update
+            taken += 1
+
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
 
-            # Check if player already exists
-            if update.player_id in self.player_lookup:
-                # Player exists - remove old score from BST
-                old_player = self.player_lookup[update.player_id]
-                self.bst.delete(update.player_id)
-                print(f"  Updated: {old_player.username} {old_player.score} -> {update.new_score}")
+    def drain_coalesced(self, max_items=None, deadline=None):
+        """
+        Take queued updates (within the same limits as drain) and keep only
+        each player's last one.
+        The surviving updates are returned in the order they were submitted.
+        """
+        latest = {}  # player_id → newest UpdateRequest
+
+        for update in self.drain(max_items, deadline):
+            # re-insert so the dict stays ordered by each player's last update
+            if latest.pop(update.player_id, None) is not None:
+                self.updates_coalesced += 1
+                self.updates_processed += 1
+            latest[update.player_id] = update
+
+        return list(latest.values())
+
+    def apply_update(self, update):
+        """
+        Apply one update to the BST and the lookup table.
+        An existing player's Player object is updated in place (so Players
+        handed out earlier see the new score) and moved only if its rank
+        neighbours change; a new player gets a new Player.
+        Returns the player's previous score, or None for a new player.
+        Time Complexity: O(log n)
+        """
+        player = self.player_lookup.get(update.player_id)
+
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.record_lag(update)
+            start = time.perf_counter_ns()
+
+        # Check if player already exists
+        if player is not None:
+            old_score = player.score
+            if self.page_cache is not None:
+                self.page_cache.note_change(ranking_key(player),
+                                            (update.new_score, update.player_id))
+            self.engine.update_player_score(player, update.new_score)
+            player.username = update.username
+            player.timestamp = update.timestamp
+
+            if metrics is not None:
+                metrics.record("update", start)
+            return old_score
+
+        if self.page_cache is not None:
+            self.page_cache.note_change(None, (update.new_score, update.player_id))
+
+        # Create new player object, stamped when the update was submitted
+        new_player = Player(update.player_id, update.username, update.new_score, update.timestamp)
+
+        # Insert into BST
+        self.engine.insert(new_player)
+
+        # Update lookup table
+        self.player_lookup[update.player_id] = new_player
+
+        if metrics is not None:
+            metrics.record("insert", start)
+        return None
+
+    def import_players(self, records):
+        """
+        Bulk import (player_id, username, score) records, e.g. to restore a
+        leaderboard or load a season. Records are applied directly rather
+        than queued; a later record for the same player wins, and imported
+        players replace existing ones with the same id.
+
+        The batch is sorted once, merged with the players already on the
+        leaderboard, and the BST is rebuilt perfectly balanced. player_lookup
+        is filled in the same pass.
+        Time Complexity: O(n + k log k) for k records and n existing players
+        With the update log enabled, pending updates are applied first and
+        the imported records are logged as score updates.
+        Returns the number of players imported.
+        """
+        imported = {}  # player_id → (username, score), last record wins
+        for player_id, username, score in records:
+            imported[player_id] = (username, score)
+
+        now = time.time()
+
+        if self.update_log is not None:
+            logged = [UpdateRequest(player_id, score, now, username=username)
+                      for player_id, (username, score) in imported.items()]
+            # check every record before applying or logging any of them
+            for update in logged:
+                check_update(update)
+            if self.update_queue.get_size():
+                self.apply_pending(False, None, None)
+            for update in logged:
+                self.log_position = self.update_log.append(update)
+
+        batch = []
+        for player_id, (username, score) in imported.items():
+            player = self.player_lookup.get(player_id)
+            if player is None:
+                player = Player(player_id, username, score, now)
+                self.player_lookup[player_id] = player
             else:
-                # New player
-                print(f"  Added: {update.username} -> {update.new_score}")
+                player.username = username
+                player.score = score
+                player.timestamp = now
+            batch.append(player)
 
-            # Create new player object
-            new_player = Player(update.player_id, update.username, update.new_score)
+        batch.sort(key=ranking_key)
+        self.merge_batch(batch, imported)
 
-            # Insert into BST
-            self.bst.insert(new_player)
+        self.events.info("players_imported", "Imported {} players", len(batch))
+        return len(batch)
 
-            # Update lookup table
-            self.player_lookup[update.player_id] = new_player
+    def merge_batch(self, batch, batch_ids):
+        """
+        Rebuild the engine from batch (Players sorted ascending, already in
+        player_lookup) merged with every other player on the leaderboard.
+        batch_ids supports `in` for the ids in batch.
+        Time Complexity: O(n + k)
+        """
+        if len(batch) == len(self.player_lookup):
+            # nobody else is on the leaderboard
+            players = batch
+        else:
+            # untouched players are still in ascending order in the engine
+            kept = [p for p in self.engine.iter_ascending() if p.player_id not in batch_ids]
+            players = list(heapq.merge(kept, batch, key=ranking_key))
 
-            processed += 1
-            self.updates_processed += 1
+        self.engine.bulk_load(players, presorted=True)
+        if self.page_cache is not None:
+            self.page_cache.clear()
 
-        if processed > 0:
-            print(f"Processed {processed} updates")
+    def submit_scores_batch(self, player_ids, scores, usernames=None):
+        """
+        Submit many scores at once, e.g. end-of-match results.
+        player_ids, scores and the optional usernames are parallel NumPy
+        arrays or sequences; a later entry for the same player wins.
+
+        The batch is deduplicated and sorted in one vectorized step (see
+        batch_ingest) and, when it is large relative to the leaderboard,
+        merged into the engine in a single O(n + k) rebuild instead of k queued
+        updates. Pending queued updates are applied first, so the batch
+        lands after them as if it had been submitted and processed now.
+        Returns the number of distinct players in the batch.
+        Time Complexity: O(k log k + n), or O(k log n) for a small batch
+        """
+        ids, batch_scores, names = prepare_batch(player_ids, scores, usernames)
+
+        if self.update_queue.get_size():
+            self.apply_pending(False, None, None)
+
+        # players given no username keep their current one
+        lookup = self.player_lookup
+        if names is None:
+            names = [lookup[player_id].username if player_id in lookup else None for player_id in ids]
+        else:
+            names = [lookup[player_id].username if username is None and player_id in lookup else username
+                     for player_id, username in zip(ids, names)]
+
+        now = time.time()
+
+        if self.update_log is not None:
+            logged = [UpdateRequest(player_id, score, now, username=username)
+                      for player_id, score, username in zip(ids, batch_scores, names)]
+            # check the whole batch before logging or applying any of it
+            for update in logged:
+                check_update(update)
+            for update in logged:
+                self.log_position = self.update_log.append(update)
+
+        # a rebuild touches all n players; k single updates cost O(log n) each
+        if len(ids) * 16 < len(self.player_lookup):
+            for player_id, score, username in zip(ids, batch_scores, names):
+                self.apply_update(UpdateRequest(player_id, score, now, username=username))
         else:
-            print(f"No updates to process")
+            batch = []
+            for player_id, score, username in zip(ids, batch_scores, names):
+                player = self.player_lookup.get(player_id)
+                if player is None:
+                    player = Player(player_id, username, score, now)
+                    self.player_lookup[player_id] = player
+                else:
+                    player.username = username
+                    player.score = score
+                    player.timestamp = now
+                batch.append(player)
+
+            self.merge_batch(batch, set(ids))
+
+        self.total_updates += len(player_ids)
+        self.updates_processed += len(player_ids)
+        self.updates_coalesced += len(player_ids) - len(ids)
+
+        self.events.info("batch_submitted", "Applied batch of {} scores ({} players)",
+                         len(player_ids), len(ids))
+        return len(ids)
+
+    def enable_update_log(self, path, durable=True, group_size=256, group_interval=0.01):
+        """
+        Start logging every accepted update to an append-only file, and
+        recover from it: logged entries newer than the last restored
+        snapshot are replayed in FIFO order. Updates go back into the
+        queue; a logged removal or clear first applies the updates queued
+        before it, as remove_player and clear_leaderboard did.
+
+        Typical startup: restore_snapshot() (if one exists), then
+        enable_update_log(). Updates are committed in groups (see UpdateLog),
+        so a crash can lose at most the last uncommitted group; durable=False
+        skips fsync for speed. Updates a drop_oldest queue discarded are
+        still in the log and come back on replay. When the backlog does not
+        fit a bounded queue, queued updates are applied to make room, so no
+        logged update is dropped.
+        Returns the number of replayed entries.
+        """
+        self.update_log = UpdateLog(path, durable, group_size, group_interval,
+                                    start_sequence=self.log_position)
+
+        replayed = 0
+        for op, update in self.update_log.replay(self.log_position):
+            if op == OP_CLEAR:
+                self.clear_state()
+            elif op == OP_REMOVE:
+                if self.update_queue.get_size():
+                    self.apply_pending(False, None, None)
+                self.drop_player(update.player_id)
+            else:
+                if self.update_queue.is_full():
+                    self.apply_pending(False, None, None)
+                if not self.update_queue.enqueue(update):
+                    raise RuntimeError(f"Could not queue replayed update for {update.player_id!r}")
+                self.total_updates += 1
+            replayed += 1
+
+        self.log_position = self.update_log.last_sequence
+
+        self.events.info("log_replayed", "Replayed {} log entries from {}", replayed, path)
+        return replayed
+
+    def save_snapshot(self, path, truncate_log=True):
+        """
+        Save players, pending updates and counters to a binary snapshot file.
+        The snapshot records the update log position it covers; with
+        truncate_log=True the log entries it covers are then dropped.
+        Time Complexity: O(n + pending updates)
+        """
+        if self.update_log is not None:
+            self.update_log.flush()
+
+        write_snapshot(self, path)
+        self.events.info("snapshot_saved", "Saved snapshot of {} players to {}", self.engine.get_size(), path)
+
+        if self.update_log is not None and truncate_log:
+            self.update_log.truncate(self.log_position)
+
+    def restore_snapshot(self, path):
+        """
+        Replace the current state with a snapshot written by save_snapshot().
+        Time Complexity: O(n + pending updates) - balanced rebuild, no replay
+        """
+        read_snapshot(self, path)
+        if self.page_cache is not None:
+            self.page_cache.clear()
+        self.events.info("snapshot_restored", "Restored {} players from {}", self.engine.get_size(), path)
+
+    def enable_page_cache(self, capacity=128):
+        """
+        Cache top-N and page results (see PageCache). A cached page is only
+        recomputed after an applied update changes its rank window.
+        """
+        self.page_cache = PageCache(capacity)
+
+    def add_hook(self, hook):
+        """
+        Attach a tracer (see hooks.Hook) to this system's ranking engine, queue and
+        process_updates batches.
+        """
+        if self.hooks is None:
+            self.hooks = HookRegistry()
+        self.hooks.add(hook)
+        self.engine.hooks = self.hooks
+        self.update_queue.hooks = self.hooks
+
+    def remove_hook(self, hook):
+        """Detach a tracer; with none left, hooked operations cost nothing extra"""
+        self.hooks.remove(hook)
+        if not self.hooks:
+            self.hooks = None
+            self.engine.hooks = None
+            self.update_queue.hooks = None
+
+    def enable_metrics(self):
+        """
+        Record latency histograms for insert, update, delete, rank, top-N
+        and page operations, and the queue lag of every applied update.
+        Read them with get_metrics().
+        """
+        self.metrics = Metrics()
+
+    def get_metrics(self):
+        """
+        Snapshot of the instrumentation: latency and queue-lag histogram
+        summaries (once enable_metrics() was called), the ranking engine's
+        shape (see RankingEngine.get_shape), and the queue backlog.
+        Time Complexity: O(1) in the number of players
+        """
+        snapshot = self.metrics.snapshot() if self.metrics is not None else {}
+
+        snapshot['engine'] = self.engine.get_shape()
+
+        oldest = self.update_queue.peek()
+        snapshot['queue'] = {
+            'pending': self.update_queue.get_size(),
+            'oldest_pending_age_s': time.time() - oldest.timestamp if oldest is not None else 0.0,
+        }
+        return snapshot
 
     def get_leaderboard(self, top_n=None):
         """
         Get current leaderboard rankings.
-        Time Complexity: O(n) for full leaderboard, O(n) for top n
+        Time Complexity: O(n) for full leaderboard, O(log n + top_n) for top n
+        (O(top_n) copy when cached)
         """
         if top_n is None:
-            return self.bst.get_leaderboard()
-        else:
-            return self.bst.get_top_n(top_n)
+            return self.engine.get_leaderboard()
+
+        if self.metrics is None:
+            return self.read_page(0, top_n)
+
+        start = time.perf_counter_ns()
+        page = self.read_page(0, top_n)
+        self.metrics.record("top_n", start)
+        return page
+
+    def get_leaderboard_page(self, offset, limit):
+        """
+        Get one page of the leaderboard: limit players starting after the
+        first offset ranks (offset 0 starts at rank 1).
+        Time Complexity: O(log n + limit) (O(limit) copy when cached)
+        """
+        if self.metrics is None:
+            return self.read_page(offset, limit)
+
+        start = time.perf_counter_ns()
+        page = self.read_page(offset, limit)
+        self.metrics.record("page", start)
+        return page
+
+    def read_page(self, offset, limit):
+        """limit players from rank offset + 1, through the page cache if enabled"""
+        if self.page_cache is None:
+            return list(self.engine.iter_range(offset, limit))
+
+        page = self.page_cache.get(offset, limit)
+        if page is None:
+            page = list(self.engine.iter_range(offset, limit))
+            self.page_cache.put(offset, limit, page)
+        return page
 
     def get_player_rank(self, player_id):
         """
         Get a specific player's rank.
-        Time Complexity: O(n)
+        Time Complexity: O(log n) - hash map lookup + order-statistic descent
+        """
+        player = self.player_lookup.get(player_id)
+        if player is None:
+            return -1
+
+        if self.metrics is None:
+            return self.engine.rank_of_player(player)
+
+        start = time.perf_counter_ns()
+        rank = self.engine.rank_of_player(player)
+        self.metrics.record("rank", start)
+        return rank
+
+    def get_player_at_rank(self, rank):
+        """
+        Get the player holding a given rank (1 = highest score).
+        Time Complexity: O(log n)
+        """
+        return self.engine.player_at_rank(rank)
+
+    def get_players_in_score_range(self, low, high):
+        """
+        Get the players scoring between low and high (inclusive), highest first.
+        Time Complexity: O(log n + k) for k matching players
         """
-        return self.bst.get_rank(player_id)
+        return list(self.engine.iter_score_range(low, high))
+
+    def count_players_in_score_range(self, low, high):
+        """
+        Count the players scoring between low and high (inclusive).
+        Time Complexity: O(log n)
+        """
+        return self.engine.count_in_score_range(low, high)
+
+    def count_players_above(self, score):
+        """
+        Count the players scoring strictly higher than score.
+        Time Complexity: O(log n)
+        """
+        return self.engine.count_above(score)
+
+    def get_score_percentile(self, percentile):
+        """
+        Get the score at a percentile (0-100) of the current leaderboard,
+        e.g. 99 for the reward tier threshold. None if there are no players.
+        Time Complexity: O(log n)
+        """
+        return self.engine.score_at_percentile(percentile)
 
     def get_player(self, player_id):
         """
@@ -169,11 +700,18 @@ class LeaderboardSystem:
         Get system statistics.
         """
         return {
-            'total_players': self.bst.get_size(),
+            'total_players': self.engine.get_size(),
             'pending_updates': self.update_queue.get_size(),
             'total_updates_submitted': self.total_updates,
             'updates_processed': self.updates_processed,
-            'bst_size': self.bst.get_size(),
+            'updates_coalesced': self.updates_coalesced,
+            'updates_dropped': self.update_queue.dropped,
+            'updates_rejected': self.update_queue.rejected,
+            'events': dict(self.events.counts),
+            # pre-engine name, kept for existing stats consumers; it is the
+            # size of whichever ranking engine is in use
+            'bst_size': self.engine.get_size(),
+            'page_cache': self.page_cache.get_stats() if self.page_cache is not None else None,
         }
 
     def display_stats(self):
@@ -192,26 +730,59 @@ class LeaderboardSystem:
     def remove_player(self, player_id):
         """
         Remove a player from the leaderboard.
+        With the update log enabled, pending updates are applied first and
+        the removal is logged, so replay removes the player at the same point.
         """
+        if self.update_log is not None:
+            if self.update_queue.get_size():
+                self.apply_pending(False, None, None)
+            if player_id not in self.player_lookup:
+                return False
+            removal = UpdateRequest(player_id, 0)
+            check_update(removal)
+            self.log_position = self.update_log.append(removal, OP_REMOVE)
+
+        return self.drop_player(player_id)
+
+    def drop_player(self, player_id):
+        """Remove a player without logging; body of remove_player"""
         if player_id not in self.player_lookup:
             return False
 
-        # Remove from BST
-        self.bst.delete(player_id)
-
         # Remove from lookup
         player = self.player_lookup.pop(player_id)
 
-        print(f"Removed player: {player.username}")
+        # Remove from BST
+        if self.page_cache is not None:
+            self.page_cache.note_change(ranking_key(player), None)
+
+        if self.metrics is not None:
+            start = time.perf_counter_ns()
+            self.engine.delete_player(player)
+            self.metrics.record("delete", start)
+        else:
+            self.engine.delete_player(player)
+
+        self.events.info("player_removed", "Removed player: {}", player.username)
         return True
 
     def clear_leaderboard(self):
         """Clear all players and pending updates"""
-        self.bst.clear()
+        if self.update_log is not None:
+            self.log_position = self.update_log.append(UpdateRequest("", 0), OP_CLEAR)
+
+        self.clear_state()
+
+    def clear_state(self):
+        """Clear without logging; body of clear_leaderboard"""
+        self.engine.clear()
         self.update_queue.clear()
         self.player_lookup.clear()
+        if self.page_cache is not None:
+            self.page_cache.clear()
         self.total_updates = 0
         self.updates_processed = 0
+        self.updates_coalesced = 0
 
-        print("Leaderboard cleared")
+        self.events.info("leaderboard_cleared", "Leaderboard cleared")
 
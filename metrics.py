@@ -0,0 +1,124 @@
+"""
+Low-overhead instrumentation for the leaderboard hot paths: latency
+histograms per operation and queue lag (submission to application).
+"""
+import time
+
+# each power-of-two range of values is split into this many buckets, so a
+# percentile read from the histogram is within 1/SUB_BUCKETS of the truth
+SUB_BITS = 2
+SUB_BUCKETS = 1 << SUB_BITS
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of non-negative integer samples (nanoseconds).
+
+    record() is a bit_length, a shift and a list increment - no sorting and
+    no stored samples - so it is cheap enough to leave on in production.
+    Percentiles are reported as the upper bound of their bucket.
+    """
+
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self):
+        self.buckets = [0] * (64 * SUB_BUCKETS)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        """Add one sample. Time Complexity: O(1)"""
+        if value < 0:
+            value = 0
+
+        bits = value.bit_length()
+        if bits <= SUB_BITS:
+            index = value
+        else:
+            # octave from the bit length, sub-bucket from the next bits down
+            index = (bits - SUB_BITS) * SUB_BUCKETS + ((value >> (bits - SUB_BITS - 1)) & (SUB_BUCKETS - 1))
+
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    @staticmethod
+    def bucket_upper_bound(index):
+        """Largest value that falls in bucket index"""
+        octave, sub = divmod(index, SUB_BUCKETS)
+        if octave == 0:
+            return sub
+        width = 1 << (octave - 1)
+        return (SUB_BUCKETS + sub) * width + width - 1
+
+    def percentile(self, percentile):
+        """Approximate value at a percentile (0-100); 0 with no samples"""
+        if self.count == 0:
+            return 0
+
+        threshold = self.count * percentile / 100
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= threshold:
+                return min(self.bucket_upper_bound(index), self.max)
+        return self.max
+
+    def summary(self):
+        """count, mean, p50, p90, p99 and max of the samples"""
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'max': self.max,
+        }
+
+    def reset(self):
+        self.buckets = [0] * (64 * SUB_BUCKETS)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+
+class Metrics:
+    """
+    Per-operation latency histograms plus a queue-lag histogram.
+
+    Callers take start = time.perf_counter_ns() before an operation and call
+    record(operation, start) after it. Queue lag is the wall-clock time from
+    UpdateRequest.timestamp (set at submission) to when the update is
+    applied, recorded by record_lag().
+    """
+
+    OPERATIONS = ("insert", "update", "delete", "rank", "top_n", "page")
+
+    def __init__(self):
+        self.latency = {operation: LatencyHistogram() for operation in self.OPERATIONS}
+        self.queue_lag = LatencyHistogram()
+
+    def record(self, operation, start):
+        """Record the time since start (a perf_counter_ns reading)"""
+        self.latency[operation].record(time.perf_counter_ns() - start)
+
+    def record_lag(self, update):
+        """Record how long an update waited between submission and application"""
+        self.queue_lag.record(int((time.time() - update.timestamp) * 1e9))
+
+    def snapshot(self):
+        """Histogram summaries (all values in nanoseconds)"""
+        return {
+            'latency_ns': {operation: histogram.summary()
+                           for operation, histogram in self.latency.items()},
+            'queue_lag_ns': self.queue_lag.summary(),
+        }
+
+    def reset(self):
+        """Forget all samples, e.g. at the start of a reporting interval"""
+        for histogram in self.latency.values():
+            histogram.reset()
+        self.queue_lag.reset()
@@ -0,0 +1,541 @@
+"""
+Multiple leaderboards (per mode, region, season, ...) in one system.
+One ingest queue feeds every board, player identities are stored once,
+and each board keeps its own ranking BST.
+"""
+import heapq
+import math
+import time
+from collections import deque
+
+from bst import BinarySearchTree
+from player import Player
+from FIFO_Queue import FIFOQueueList, UpdateRequest
+from event_log import EventLog
+
+
+class Board:
+    """
+    One ranking inside a MultiLeaderboardSystem.
+
+    Holds a BST plus a player_id → Player map for the board's members only,
+    so memory grows with memberships rather than boards × players.
+    keep decides how a new score combines with a member's current one:
+    - "latest": the newest score replaces the old one
+    - "best": only a higher score replaces the old one
+    """
+
+    LATEST = "latest"
+    BEST = "best"
+
+    def __init__(self, name, keep=LATEST):
+        if keep not in (self.LATEST, self.BEST):
+            raise ValueError(f"Unknown keep policy: {keep}")
+
+        self.name = name
+        self.keep = keep
+        self.bst = BinarySearchTree()
+        self.members = {}  # player_id → Player entry on this board
+
+    def apply(self, update, username):
+        """
+        Apply an update to this board.
+        Returns True if the board changed.
+        Time Complexity: O(log m) for m members
+        """
+        entry = self.members.get(update.player_id)
+
+        if entry is None:
+            entry = Player(update.player_id, username, update.new_score, update.timestamp)
+            self.bst.insert(entry)
+            self.members[update.player_id] = entry
+            return True
+
+        if self.keep == self.BEST and update.new_score <= entry.score:
+            return False
+
+        self.bst.update_player_score(entry, update.new_score)
+        entry.timestamp = update.timestamp
+        return True
+
+    def remove(self, player_id):
+        """Remove a member; returns False if they are not on this board"""
+        entry = self.members.pop(player_id, None)
+        if entry is None:
+            return False
+        self.bst.delete_player(entry)
+        return True
+
+    def get_leaderboard(self, top_n=None):
+        if top_n is None:
+            return self.bst.get_leaderboard()
+        return self.bst.get_top_n(top_n)
+
+    def get_leaderboard_page(self, offset, limit):
+        return list(self.bst.iter_range(offset, limit))
+
+    def get_rank(self, player_id):
+        """Rank of a member (1 = highest), or -1 if not on this board"""
+        entry = self.members.get(player_id)
+        if entry is None:
+            return -1
+        return self.bst.rank_of_player(entry)
+
+    def get_member(self, player_id):
+        """A member's entry (score, timestamp), or None"""
+        return self.members.get(player_id)
+
+    def get_size(self):
+        return self.bst.get_size()
+
+    def expire(self, now=None):
+        """Drop members whose entries have expired; plain boards never expire"""
+        return 0
+
+
+class WindowedBoard(Board):
+    """
+    Rolling-window board: ranks each member by their best (or latest)
+    score submitted in the last window seconds.
+
+    Per member, a deque holds the scores that can still become the best in
+    the window, oldest first and with decreasing scores (a newer, higher
+    score makes older, lower ones irrelevant), so the front is the current
+    best. A heap of (expiry time, player_id) orders candidates by expiry,
+    so expire() pops only what has actually expired - O(log n) each -
+    instead of rescanning the board.
+
+    Updates are expected in timestamp order per member; a late one counts
+    from the newest timestamp already seen for that member.
+    """
+
+    def __init__(self, name, window, keep=Board.BEST):
+        super().__init__(name, keep)
+        self.window = window
+        self.candidates = {}  # player_id → deque of (timestamp, score)
+        self.expiry_heap = []  # (expires_at, player_id); may hold stale items
+
+    def apply(self, update, username):
+        """
+        Add an update to the member's window and re-rank them if their best
+        score changed.
+        Time Complexity: O(log n) amortized
+        """
+        player_id = update.player_id
+        candidates = self.candidates.get(player_id)
+        if candidates is None:
+            candidates = self.candidates[player_id] = deque()
+
+        timestamp = update.timestamp
+        if candidates and timestamp < candidates[-1][0]:
+            timestamp = candidates[-1][0]
+
+        if self.keep == self.LATEST:
+            candidates.clear()
+        else:
+            while candidates and candidates[-1][1] <= update.new_score:
+                candidates.pop()
+
+        candidates.append((timestamp, update.new_score))
+        heapq.heappush(self.expiry_heap, (timestamp + self.window, player_id))
+        return self.rank_best(player_id, username)
+
+    def rank_best(self, player_id, username=None):
+        """Make a member's entry match the front of their window"""
+        timestamp, score = self.candidates[player_id][0]
+        entry = self.members.get(player_id)
+
+        if entry is None:
+            entry = Player(player_id, username, score, timestamp)
+            self.bst.insert(entry)
+            self.members[player_id] = entry
+            return True
+
+        if entry.score == score and entry.timestamp == timestamp:
+            return False
+
+        self.bst.update_player_score(entry, score)
+        entry.timestamp = timestamp
+        return True
+
+    def expire(self, now=None):
+        """
+        Drop scores older than the window. A member whose best score expires
+        falls back to the best one left in the window, or leaves the board.
+        Returns the number of members removed.
+        Time Complexity: O(log n) per expired score
+        """
+        now = time.time() if now is None else now
+        heap = self.expiry_heap
+        removed = 0
+
+        while heap and heap[0][0] <= now:
+            _, player_id = heapq.heappop(heap)
+            candidates = self.candidates.get(player_id)
+            if candidates is None:
+                continue  # stale: member already gone
+
+            while candidates and candidates[0][0] + self.window <= now:
+                candidates.popleft()
+
+            if candidates:
+                self.rank_best(player_id)
+            else:
+                self.remove(player_id)
+                removed += 1
+
+        return removed
+
+    def remove(self, player_id):
+        self.candidates.pop(player_id, None)
+        return super().remove(player_id)
+
+
+class DecayingBoard(Board):
+    """
+    Score-decay board: every score loses half its value each half_life
+    seconds.
+
+    Re-sorting decayed scores as time passes would cost O(n log n) per
+    tick. Instead each entry stores its score scaled to a fixed epoch,
+    score * 2 ** ((timestamp - epoch) / half_life). All entries then decay
+    by the same factor, so their order never changes and the BST is never
+    re-sorted; queries scale stored values back to the current time.
+
+    With a floor, expire() drops members whose decayed score has fallen
+    below it, using a heap of the times at which that happens.
+    """
+
+    # re-anchor the epoch after this many half-lives, long before the
+    # 2 ** x scale factor could overflow a float
+    REBASE_AFTER = 512
+
+    def __init__(self, name, half_life, floor=None, keep=Board.LATEST, epoch=None):
+        if half_life <= 0:
+            raise ValueError("half_life must be positive")
+        if floor is not None and floor <= 0:
+            raise ValueError("floor must be positive")
+
+        super().__init__(name, keep)
+        self.half_life = half_life
+        self.floor = floor
+        self.epoch = time.time() if epoch is None else epoch
+        self.expiry_heap = []  # (drop_time, player_id); may hold stale items
+
+    def scale(self, timestamp):
+        """Factor between a score at timestamp and its stored value"""
+        return 2.0 ** ((timestamp - self.epoch) / self.half_life)
+
+    def apply(self, update, username):
+        """
+        Store the update's score scaled to the epoch. With keep="best" it
+        only replaces the member's entry if it beats their decayed score.
+        Time Complexity: O(log n)
+        """
+        if (update.timestamp - self.epoch) / self.half_life > self.REBASE_AFTER:
+            self.rebase(update.timestamp)
+
+        stored = update.new_score * self.scale(update.timestamp)
+        entry = self.members.get(update.player_id)
+
+        if entry is None:
+            entry = Player(update.player_id, username, stored, update.timestamp)
+            self.bst.insert(entry)
+            self.members[update.player_id] = entry
+        elif self.keep == self.BEST and stored <= entry.score:
+            return False
+        else:
+            self.bst.update_player_score(entry, stored)
+            entry.timestamp = update.timestamp
+
+        if self.floor is not None:
+            heapq.heappush(self.expiry_heap, (self.drop_time(entry), entry.player_id))
+
+            # superseded heap items linger until their time comes; rebuild
+            # the heap when they outnumber the live ones
+            if len(self.expiry_heap) > 2 * len(self.members) + 64:
+                self.rebuild_expiry_heap()
+
+        return True
+
+    def drop_time(self, entry):
+        """Time at which an entry's decayed score falls below the floor"""
+        if entry.score <= 0:
+            return float("-inf")
+        return self.epoch + self.half_life * math.log2(entry.score / self.floor)
+
+    def rebuild_expiry_heap(self):
+        self.expiry_heap = [(self.drop_time(entry), player_id)
+                            for player_id, entry in self.members.items()]
+        heapq.heapify(self.expiry_heap)
+
+    def rebase(self, new_epoch):
+        """
+        Move the epoch forward, shrinking every stored value by the same
+        factor. Rounding could create new ties, so the tree is rebuilt.
+        Time Complexity: O(n log n), once per REBASE_AFTER half-lives
+        """
+        factor = self.scale(new_epoch)
+        self.epoch = new_epoch
+
+        for entry in self.members.values():
+            entry.score /= factor
+        self.bst.bulk_load(self.members.values())
+
+        if self.floor is not None:
+            self.rebuild_expiry_heap()
+
+    def decayed(self, entry, now):
+        """A copy of an entry carrying its decayed score at time now"""
+        return Player(entry.player_id, entry.username, entry.score / self.scale(now), entry.timestamp)
+
+    def expire(self, now=None):
+        """
+        Drop members whose decayed score is below the floor.
+        Returns the number of members removed.
+        Time Complexity: O(log n) per heap item popped
+        """
+        if self.floor is None:
+            return 0
+
+        now = time.time() if now is None else now
+        heap = self.expiry_heap
+        removed = 0
+
+        while heap and heap[0][0] <= now:
+            _, player_id = heapq.heappop(heap)
+            entry = self.members.get(player_id)
+
+            # the member may be gone, or a newer score may have moved their drop time
+            if entry is not None and self.drop_time(entry) <= now:
+                self.remove(player_id)
+                removed += 1
+
+        return removed
+
+    def get_leaderboard(self, top_n=None, now=None):
+        now = time.time() if now is None else now
+        return [self.decayed(entry, now) for entry in super().get_leaderboard(top_n)]
+
+    def get_leaderboard_page(self, offset, limit, now=None):
+        now = time.time() if now is None else now
+        return [self.decayed(entry, now) for entry in super().get_leaderboard_page(offset, limit)]
+
+    def get_member(self, player_id):
+        entry = self.members.get(player_id)
+        return None if entry is None else self.decayed(entry, time.time())
+
+
+class BoardUpdate(UpdateRequest):
+    """
+    An UpdateRequest that may name the boards it is for (None means the
+    default routing). Only MultiLeaderboardSystem queues these, so plain
+    queued updates do not carry the extra slot.
+    """
+
+    __slots__ = ("boards",)
+
+    def __init__(self, player_id, new_score, timestamp=None, username=None, boards=None):
+        super().__init__(player_id, new_score, timestamp, username)
+        self.boards = boards
+
+
+class MultiLeaderboardSystem:
+    """
+    Registry of many leaderboards sharing one ingest queue.
+
+    Design:
+    1. submit_score() enqueues one BoardUpdate, optionally naming its boards
+    2. process_updates() dequeues in FIFO order and routes each update to
+       its boards: update.boards if given, otherwise router(update), and by
+       default every board
+    3. usernames are kept once per player; board entries reference the same
+       string, and each board ranks only its own members
+    """
+
+    def __init__(self, router=None, queue_max_size=None, overflow_policy=FIFOQueueList.REJECT,
+                 log_level=EventLog.SILENT):
+        """
+        Initialize the registry.
+        router, if given, is called with a BoardUpdate that has no explicit
+        boards and returns the names of the boards it should be applied to.
+        """
+        self.events = EventLog(log_level)
+        self.router = router
+
+        self.boards = {}  # board name → Board
+        self.usernames = {}  # player_id → username (None if never given), every known player
+        self.update_queue = FIFOQueueList(max_size=queue_max_size,
+                                          overflow_policy=overflow_policy)
+
+        # Statistics
+        self.total_updates = 0
+        self.updates_processed = 0
+        self.board_updates = 0  # (update, board) pairs applied
+
+    def add_board(self, name, keep=Board.LATEST):
+        """Create a new, empty board and return it"""
+        return self.register_board(Board(name, keep))
+
+    def add_windowed_board(self, name, window, keep=Board.BEST):
+        """Create a board ranking scores from the last window seconds"""
+        return self.register_board(WindowedBoard(name, window, keep))
+
+    def add_decaying_board(self, name, half_life, floor=None, keep=Board.LATEST):
+        """Create a board whose scores halve every half_life seconds"""
+        return self.register_board(DecayingBoard(name, half_life, floor, keep))
+
+    def register_board(self, board):
+        """Add a board (a Board or subclass instance) and return it"""
+        if board.name in self.boards:
+            raise ValueError(f"Board {board.name!r} already exists")
+
+        self.boards[board.name] = board
+        self.events.info("board_added", "Added board: {}", board.name)
+        return board
+
+    def remove_board(self, name):
+        """Drop a board and its rankings; returns False if it does not exist"""
+        if self.boards.pop(name, None) is None:
+            return False
+        self.events.info("board_removed", "Removed board: {}", name)
+        return True
+
+    def get_board(self, name):
+        """Get a board by name (KeyError if it does not exist)"""
+        return self.boards[name]
+
+    def submit_score(self, player_id, username, score, boards=None, timestamp=None):
+        """
+        Submit a score update, for the given board names or the default routing.
+        timestamp (default: now) is when the score was achieved; windowed and
+        decaying boards age scores from it.
+        Returns False if a bounded queue is full and rejected the update.
+        Time Complexity: O(1) - just enqueues
+        """
+        update = BoardUpdate(player_id, score, timestamp, username=username,
+                             boards=tuple(boards) if boards is not None else None)
+
+        if not self.update_queue.enqueue(update):
+            self.events.debug("score_rejected", "Rejected update (queue full): {} ({}) -> {}",
+                              username, player_id, score)
+            return False
+
+        self.total_updates += 1
+        self.events.debug("score_queued", "Queued update: {} ({}) -> {}", username, player_id, score)
+        return True
+
+    def route(self, update):
+        """Names of the boards an update applies to"""
+        if update.boards is not None:
+            return update.boards
+        if self.router is not None:
+            return self.router(update)
+        return self.boards.keys()
+
+    def process_updates(self, max_items=None, max_seconds=None):
+        """
+        Route pending updates to their boards in FIFO order, within the
+        optional budgets (see LeaderboardSystem.process_updates).
+        Returns (applied, remaining).
+        Time Complexity: O(b log m) per update routed to b boards
+        """
+        if max_items is not None and max_items < 1:
+            raise ValueError("max_items must be at least 1")
+
+        processed = 0
+        deadline = None if max_seconds is None else time.perf_counter() + max_seconds
+
+        while max_items is None or processed < max_items:
+            update = self.update_queue.dequeue()
+            if update is None:
+                break
+
+            self.apply_update(update)
+            processed += 1
+            self.updates_processed += 1
+
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+
+        remaining = self.update_queue.get_size()
+        self.events.info("processing_finished", "Processed {} updates ({} remaining)",
+                         processed, remaining)
+        return processed, remaining
+
+    def apply_update(self, update):
+        """Apply one update to every board it routes to"""
+        username = self.usernames.get(update.player_id)
+
+        if update.username is not None and update.username != username:
+            username = update.username
+            self.usernames[update.player_id] = username
+
+            # a renamed player: point existing entries at the shared new name
+            for board in self.boards.values():
+                entry = board.members.get(update.player_id)
+                if entry is not None:
+                    entry.username = username
+        elif username is None and update.player_id not in self.usernames:
+            # a new player without a name is still known (remove_player, stats)
+            self.usernames[update.player_id] = None
+
+        for name in self.route(update):
+            board = self.boards.get(name)
+            if board is not None and board.apply(update, username):
+                self.board_updates += 1
+                self.events.debug("board_updated", "  {}: {} -> {}", name, username, update.new_score)
+
+    def expire(self, now=None):
+        """
+        Expire old entries on every board (call periodically, e.g. after
+        process_updates). Returns the number of memberships removed.
+        Time Complexity: O(log n) per expired entry - no board is rescanned
+        """
+        now = time.time() if now is None else now
+        removed = sum(board.expire(now) for board in self.boards.values())
+        if removed:
+            self.events.info("entries_expired", "Expired {} board entries", removed)
+        return removed
+
+    def remove_player(self, player_id):
+        """Remove a player from every board and forget their identity"""
+        if player_id not in self.usernames:
+            return False
+
+        for board in self.boards.values():
+            board.remove(player_id)
+        del self.usernames[player_id]
+        return True
+
+    def get_leaderboard(self, board, top_n=None):
+        """Rankings of one board (all, or the top N)"""
+        return self.boards[board].get_leaderboard(top_n)
+
+    def get_leaderboard_page(self, board, offset, limit):
+        """One page of a board's rankings"""
+        return self.boards[board].get_leaderboard_page(offset, limit)
+
+    def get_player_rank(self, board, player_id):
+        """A player's rank on one board, or -1 if they are not on it"""
+        return self.boards[board].get_rank(player_id)
+
+    def get_player(self, board, player_id):
+        """A player's entry (score, timestamp) on one board, or None"""
+        return self.boards[board].get_member(player_id)
+
+    def get_username(self, player_id):
+        """A player's username, or None if unknown"""
+        return self.usernames.get(player_id)
+
+    def get_stats(self):
+        """Get system statistics"""
+        return {
+            'boards': len(self.boards),
+            'total_players': len(self.usernames),
+            'memberships': sum(board.get_size() for board in self.boards.values()),
+            'pending_updates': self.update_queue.get_size(),
+            'total_updates_submitted': self.total_updates,
+            'updates_processed': self.updates_processed,
+            'board_updates': self.board_updates,
+        }
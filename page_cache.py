@@ -0,0 +1,117 @@
+"""
+LRU cache of rendered leaderboard pages with incremental invalidation.
+"""
+import threading
+from collections import OrderedDict
+
+from player import ranking_key
+
+
+class PageCache:
+    """
+    Caches get_leaderboard(top_n) / get_leaderboard_page results.
+    A top-N query is the page at offset 0.
+
+    Each cached page remembers the ranking keys (score, player_id) of its
+    first and last player. An applied update moves one player from an old
+    key to a new one (None when the player is new or removed), and it can
+    only leave a page unchanged if both keys are below the page's last
+    player, or both are above its first player (the ranks above the page
+    shift by zero). Everything else invalidates the page. Updates below the
+    lowest cached page are rejected with one comparison, so with most
+    updates far from the cached top pages invalidation is O(1).
+
+    The least recently used page is evicted once capacity pages are cached.
+    A lock keeps the cache consistent when several readers share it.
+    """
+
+    def __init__(self, capacity=128):
+        self.capacity = capacity
+        self.pages = OrderedDict()  # (offset, limit) → (players, high_key, low_key)
+
+        # lowest low_key over the cached pages; None if any page reaches the
+        # end of the board (then every update may matter)
+        self.floor = None
+        self.lock = threading.Lock()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, offset, limit):
+        """Get a cached page (a fresh list), or None on a miss"""
+        with self.lock:
+            entry = self.pages.get((offset, limit))
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.pages.move_to_end((offset, limit))
+            self.hits += 1
+            return list(entry[0])
+
+    def put(self, offset, limit, players):
+        """Cache a page just computed from the tree"""
+        if limit is not None and limit <= 0:
+            return  # always empty; nothing worth caching
+
+        high = ranking_key(players[0]) if players else None
+        # a short page reaches the end of the board: anything below can join it
+        low = ranking_key(players[-1]) if players and len(players) == limit else None
+
+        with self.lock:
+            if not self.pages:
+                self.floor = low
+            elif self.floor is not None and (low is None or low < self.floor):
+                self.floor = low
+
+            self.pages[(offset, limit)] = (list(players), high, low)
+            self.pages.move_to_end((offset, limit))
+
+            if len(self.pages) > self.capacity:
+                self.pages.popitem(last=False)
+
+    def note_change(self, old_key, new_key):
+        """
+        Invalidate the pages a player's move from old_key to new_key can
+        change. Either key is None when the player is absent (treated as
+        ranked below everyone).
+        Time Complexity: O(1) below the cached pages, O(pages) otherwise
+        """
+        top = new_key if old_key is None else old_key if new_key is None else max(old_key, new_key)
+        bottom = None if old_key is None or new_key is None else min(old_key, new_key)
+
+        if self.floor is not None and top < self.floor:
+            return
+
+        with self.lock:
+            stale = [page for page, (_, high, low) in self.pages.items()
+                     if not ((low is not None and top < low)
+                             or (high is not None and bottom is not None and bottom > high))]
+
+            if stale:
+                for page in stale:
+                    del self.pages[page]
+                self.invalidations += len(stale)
+                self.recompute_floor()
+
+    def recompute_floor(self):
+        """Caller holds the lock"""
+        lows = [low for _, _, low in self.pages.values()]
+        self.floor = None if not lows or None in lows else min(lows)
+
+    def clear(self):
+        """Drop every cached page (e.g. after a bulk change to the tree)"""
+        with self.lock:
+            self.invalidations += len(self.pages)
+            self.pages.clear()
+            self.floor = None
+
+    def get_stats(self):
+        return {
+            'cached_pages': len(self.pages),
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+        }
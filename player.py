@@ -1,15 +1,22 @@
 """
 Player class - represents a player in the leaderboard system
 """
-from datetime import datetime
+import time
+from operator import attrgetter
 
 
 class Player:
     """
     Represents a player with a score and other information.
     Players are compared by score (and player_id as tiebreaker).
+
+    __slots__ drops the per-instance __dict__, and the timestamp is a float
+    (seconds since the epoch) rather than a datetime object, which keeps
+    each player small when there are millions of them.
     """
-    
+
+    __slots__ = ("player_id", "username", "score", "timestamp")
+
     def __init__(self, player_id, username, score, timestamp=None):
         """
         Initialize a player.
@@ -17,7 +24,7 @@ class Player:
         self.player_id = player_id
         self.username = username
         self.score = score
-        self.timestamp = timestamp or datetime.now()
+        self.timestamp = time.time() if timestamp is None else timestamp
     
     def __lt__(self, other):
         """
@@ -34,6 +41,14 @@ class Player:
         return self.player_id == other.player_id
 
 
+    def copy(self):
+        """A detached copy, unaffected by later in-place score updates"""
+        return Player(self.player_id, self.username, self.score, self.timestamp)
+
     def __str__(self):
         """Human-readable string"""
         return f"{self.username}: {self.score}"
+
+
+# Sort key with the same ordering as Player.__lt__, for sorted()/heapq/bisect
+ranking_key = attrgetter("score", "player_id")
@@ -0,0 +1,199 @@
+"""
+Ranking engine interface: the ordered player store behind LeaderboardSystem.
+"""
+import math
+from abc import ABC, abstractmethod
+
+
+class RankingEngine(ABC):
+    """
+    Abstract base class for ranking engines.
+
+    An engine keeps players ordered by (score, player_id), ascending; rank 1
+    is the highest. Subclasses implement the abstract primitives below and
+    keep self.size up to date; the remaining queries are derived from them.
+    An engine missing a primitive fails when it is constructed.
+
+    Engines (see LeaderboardSystem's engine option):
+    - BinarySearchTree: AVL tree with subtree sizes
+    - SortedBlockList: sorted array split into blocks, for read-heavy boards
+    """
+
+    @abstractmethod
+    def insert(self, player):
+        """Insert a player"""
+
+    @abstractmethod
+    def delete_player(self, player):
+        """Delete a player carrying the score it was inserted with; False if absent"""
+
+    @abstractmethod
+    def update_player_score(self, player, new_score):
+        """Change the score of a player already in the engine"""
+
+    @abstractmethod
+    def search(self, player_id):
+        """Find a player by player_id, or None"""
+
+    @abstractmethod
+    def iter_ascending(self):
+        """Lazily yield players from low to high score"""
+
+    @abstractmethod
+    def iter_range(self, offset, limit=None):
+        """Lazily yield up to limit players in rank order, skipping the first offset"""
+
+    @abstractmethod
+    def count_ahead(self, player):
+        """Count the players ranked strictly above the player's (score, player_id)"""
+
+    @abstractmethod
+    def rank_of_player(self, player):
+        """Rank (1 = highest) of a player in the engine, or -1"""
+
+    @abstractmethod
+    def player_at_rank(self, rank):
+        """Player holding a rank, or None if it is out of range"""
+
+    @abstractmethod
+    def count_below(self, score):
+        """Count the players scoring strictly lower than score"""
+
+    @abstractmethod
+    def count_above(self, score):
+        """Count the players scoring strictly higher than score"""
+
+    @abstractmethod
+    def bulk_load(self, players, presorted=False):
+        """Replace the contents with players (presorted: already ascending)"""
+
+    @abstractmethod
+    def clear(self):
+        """Remove all players"""
+
+    @abstractmethod
+    def get_shape(self):
+        """Engine-specific structure statistics (for get_metrics)"""
+
+    def delete(self, player_id):
+        """
+        Delete a player by player_id.
+        Finding the player by id is a scan; callers that already hold
+        the Player object should use delete_player() instead.
+        """
+        player = self.search(player_id)
+
+        # Check if player exists first
+        if player is None:
+            return False
+
+        return self.delete_player(player)
+
+    def update_score(self, player_id, new_score):
+        """
+        Change a player's score by player_id.
+        Finding the player by id is a scan; callers that already hold
+        the Player object should use update_player_score() instead.
+        """
+        player = self.search(player_id)
+
+        if player is None:
+            return False
+
+        return self.update_player_score(player, new_score)
+
+    def get_rank(self, player_id):
+        """
+        Get the rank of a player.
+        Finding the player by id is a scan; callers that already hold
+        the Player object should use rank_of_player() instead.
+        """
+        player = self.search(player_id)
+
+        # Player not found
+        if player is None:
+            return -1
+
+        return self.rank_of_player(player)
+
+    def inorder_traversal(self):
+        """
+        Perform in-order traversal of the tree.
+        this returns players in low to high score.
+        """
+        return list(self.iter_ascending())
+
+    def reverse_inorder_traversal(self):
+        """
+        This returns players in order  of high to low score.
+        This is what we want for  our leaderboard
+        """
+        return list(self.iter_descending())
+
+    def iter_descending(self):
+        """
+        Lazily yield players from high to low score (rank order).
+        """
+        return self.iter_range(0)
+
+    def get_leaderboard(self):
+        """
+        Get the leaderboard
+        """
+        return self.reverse_inorder_traversal()
+
+    def get_top_n(self, n):
+        """
+        Get the top N players with highest scores.
+        Stops after N players instead of building the full leaderboard.
+        """
+        return list(self.iter_range(0, n))
+
+    def count_in_score_range(self, low, high):
+        """
+        Count the players with low <= score <= high.
+        Time Complexity: O(log n)
+        """
+        if low > high:
+            return 0
+        return self.size - self.count_below(low) - self.count_above(high)
+
+    def iter_score_range(self, low, high):
+        """
+        Lazily yield the players with low <= score <= high, highest first.
+        Time Complexity: O(log n + k) for k matching players
+        """
+        if low > high:
+            return
+
+        # the first match sits right after everyone scoring above high
+        for player in self.iter_range(self.count_above(high)):
+            if player.score < low:
+                return
+            yield player
+
+    def score_at_percentile(self, percentile):
+        """
+        Get the score at a percentile (0-100) using the nearest-rank method:
+        at least percentile% of players score at or below the returned score.
+        Returns None if the engine is empty.
+        Time Complexity: O(log n)
+        """
+        if self.size == 0:
+            return None
+
+        percentile = min(max(percentile, 0), 100)
+
+        # 1-based position counted from the lowest score, clamped to [1, n]
+        position = max(1, math.ceil(percentile / 100 * self.size))
+
+        # convert to a rank counted from the top
+        return self.player_at_rank(self.size - position + 1).score
+
+    def is_empty(self):
+        """Check if the engine holds no players"""
+        return self.size == 0
+
+    def get_size(self):
+        """Get number of players"""
+        return self.size
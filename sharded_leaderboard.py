@@ -0,0 +1,219 @@
+"""
+Sharded leaderboard: players are partitioned by player_id hash across worker
+processes, each owning its own LeaderboardSystem (BST + queue), so updates
+are applied on several cores at once.
+"""
+import heapq
+import multiprocessing
+import os
+import zlib
+from itertools import islice
+
+from leaderboard_system import LeaderboardSystem
+from player import Player, ranking_key
+
+
+def shard_worker(connection, engine="bst"):
+    """
+    Main loop of one shard process.
+    Receives (command, args) tuples and replies with ("ok", result) or
+    ("error", message). "submit" is fire-and-forget and sends no reply.
+    """
+    system = LeaderboardSystem(engine=engine)
+
+    while True:
+        command, args = connection.recv()
+
+        if command == "submit":
+            for player_id, username, score in args:
+                system.submit_score(player_id, username, score)
+            continue
+
+        if command == "stop":
+            connection.send(("ok", None))
+            return
+
+        try:
+            if command == "process":
+                result = system.process_updates(**args)
+            elif command == "top_n":
+                result = system.get_leaderboard(args)
+            elif command == "count_ahead":
+                score, player_id = args
+                result = system.engine.count_ahead(Player(player_id, None, score))
+            elif command == "count_above":
+                result = system.count_players_above(args)
+            elif command == "get_player":
+                result = system.get_player(args)
+            elif command == "stats":
+                result = system.get_stats()
+            else:
+                raise ValueError(f"Unknown shard command: {command}")
+        except Exception as error:
+            connection.send(("error", f"{type(error).__name__}: {error}"))
+        else:
+            connection.send(("ok", result))
+
+
+class ShardedLeaderboard:
+    """
+    Coordinator for a leaderboard split across worker processes.
+
+    Design:
+    1. submit_score() routes each update to shard crc32(player_id) % shards,
+       buffering submissions and shipping them in batches
+    2. process_updates() makes every shard apply its queue in parallel
+    3. Global queries are answered from per-shard answers:
+       - top-N: k-way merge of each shard's top-N
+       - rank: 1 + sum over shards of the players ranked above the player
+
+    A player always lives on the same shard, so per-player FIFO order holds.
+    Use as a context manager, or call close() to stop the worker processes.
+    """
+
+    def __init__(self, num_shards=None, batch_size=1024, engine="bst"):
+        """
+        Start num_shards worker processes (default: one per CPU).
+        batch_size is how many submissions are buffered per shard before
+        they are sent; engine is each shard's ranking engine.
+        """
+        self.num_shards = num_shards or os.cpu_count() or 1
+        self.batch_size = batch_size
+
+        self.connections = []
+        self.processes = []
+        self.buffers = [[] for _ in range(self.num_shards)]  # unsent submissions
+
+        for shard in range(self.num_shards):
+            parent_end, child_end = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=shard_worker, args=(child_end, engine),
+                                              name=f"leaderboard-shard-{shard}", daemon=True)
+            process.start()
+            child_end.close()
+            self.connections.append(parent_end)
+            self.processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def shard_for(self, player_id):
+        """
+        Shard index owning a player. crc32 (unlike hash()) is the same in
+        every process and every run.
+        """
+        return zlib.crc32(str(player_id).encode("utf-8")) % self.num_shards
+
+    def request(self, shard, command, args=None):
+        """Send a command to one shard and wait for its reply"""
+        self.connections[shard].send((command, args))
+        return self.receive(shard)
+
+    def broadcast(self, command, args=None):
+        """
+        Send a command to every shard, then collect the replies, so the
+        shards work on it in parallel.
+        """
+        for connection in self.connections:
+            connection.send((command, args))
+        return [self.receive(shard) for shard in range(self.num_shards)]
+
+    def receive(self, shard):
+        status, result = self.connections[shard].recv()
+        if status == "error":
+            raise RuntimeError(f"Shard {shard} failed: {result}")
+        return result
+
+    def submit_score(self, player_id, username, score):
+        """
+        Submit a score update; it is routed to the player's shard.
+        Time Complexity: O(1) - buffered, sent in batches
+        """
+        shard = self.shard_for(player_id)
+        buffer = self.buffers[shard]
+        buffer.append((player_id, username, score))
+
+        if len(buffer) >= self.batch_size:
+            self.send_buffer(shard)
+
+    def send_buffer(self, shard):
+        """Ship one shard's buffered submissions"""
+        if self.buffers[shard]:
+            self.connections[shard].send(("submit", self.buffers[shard]))
+            self.buffers[shard] = []
+
+    def flush_submissions(self):
+        """Ship every buffered submission to its shard"""
+        for shard in range(self.num_shards):
+            self.send_buffer(shard)
+
+    def process_updates(self, coalesce=False, max_items=None, max_seconds=None):
+        """
+        Apply pending updates on every shard in parallel. The budgets apply
+        per shard. Returns (applied, remaining) summed over the shards.
+        """
+        if max_items is not None and max_items < 1:
+            raise ValueError("max_items must be at least 1")
+
+        self.flush_submissions()
+        results = self.broadcast("process", {"coalesce": coalesce, "max_items": max_items,
+                                             "max_seconds": max_seconds})
+        return sum(r[0] for r in results), sum(r[1] for r in results)
+
+    def get_leaderboard(self, top_n):
+        """
+        Get the global top N players: each shard returns its own top N and
+        the sorted lists are k-way merged.
+        Time Complexity: O(log n + N) per shard, O(N log shards) to merge
+        """
+        shard_tops = self.broadcast("top_n", top_n)
+        merged = heapq.merge(*shard_tops, key=ranking_key, reverse=True)
+        return list(islice(merged, top_n))
+
+    def get_player(self, player_id):
+        """Get a player's information from its shard"""
+        return self.request(self.shard_for(player_id), "get_player", player_id)
+
+    def get_player_rank(self, player_id):
+        """
+        Get a player's global rank: 1 + the players ranked above them on
+        every shard. Returns -1 if the player is not on the leaderboard.
+        Time Complexity: O(log n) per shard
+        """
+        player = self.get_player(player_id)
+        if player is None:
+            return -1
+
+        return 1 + sum(self.broadcast("count_ahead", (player.score, player.player_id)))
+
+    def count_players_above(self, score):
+        """Count the players, on all shards, scoring strictly higher than score"""
+        return sum(self.broadcast("count_above", score))
+
+    def get_stats(self):
+        """Get system statistics summed over the shards"""
+        self.flush_submissions()
+
+        totals = {}
+        for stats in self.broadcast("stats"):
+            for name, value in stats.items():
+                if isinstance(value, int):
+                    totals[name] = totals.get(name, 0) + value
+        totals["shards"] = self.num_shards
+        return totals
+
+    def close(self):
+        """Stop the worker processes"""
+        if not self.processes:
+            return
+
+        self.broadcast("stop")
+        for process in self.processes:
+            process.join()
+        for connection in self.connections:
+            connection.close()
+
+        self.processes = []
+        self.connections = []
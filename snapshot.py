@@ -0,0 +1,222 @@
+"""
+Snapshot and restore of the full leaderboard state in a compact binary file.
+
+File layout (little-endian), with n players and q pending updates:
+    header              fixed-size struct (HEADER below)
+    player scores       n x 8 bytes, ascending rank order
+    player timestamps   n x 8 bytes (float64)
+    player name flags   n x 1 byte (0 = username is None)
+    pending scores      q x 8 bytes, FIFO order
+    pending timestamps  q x 8 bytes
+    pending name flags  q x 1 byte
+    strings             UTF-8, NUL-separated: player ids, player usernames,
+                        pending ids, pending usernames
+
+Every column is fixed-width, so the file is read through mmap and each
+column is loaded with a single array copy. Scores are stored as int64 when
+every score in the section is an integer, and as float64 otherwise.
+Players are written in ascending order, which makes restore a single O(n)
+balanced rebuild.
+
+Player ids and usernames must be strings without NUL characters.
+"""
+import gc
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from player import Player
+from FIFO_Queue import UpdateRequest
+
+MAGIC = b"LBSNAP\r\n"
+VERSION = 1
+
+# magic, version, flags, player_count, pending_count,
+# total_updates, updates_processed, updates_coalesced, strings_size,
+# log_position (last update log sequence the snapshot covers)
+HEADER = struct.Struct("<8sHHQQQQQQQ")
+
+# header flags
+PLAYER_SCORES_INT = 1
+PENDING_SCORES_INT = 2
+
+SEPARATOR = "\x00"
+
+# 64-bit signed range for integer scores
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+
+def all_int64(scores):
+    """Check whether every score can be stored exactly as an int64"""
+    return all(type(score) is int and INT64_MIN <= score <= INT64_MAX for score in scores)
+
+
+def pack_column(typecode, values):
+    """Encode values as a little-endian fixed-width column"""
+    column = array(typecode, values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+
+
+def unpack_column(data, start, count, typecode):
+    """
+    Decode a fixed-width column of count values at data[start:].
+    Returns (values, offset just past the column).
+    """
+    column = array(typecode)
+    end = start + count * column.itemsize
+    column.frombytes(data[start:end])
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tolist(), end
+
+
+def pack_section(scores, timestamps, names, scores_int):
+    """Encode one section's score, timestamp and name-flag columns"""
+    return (pack_column("q" if scores_int else "d", scores)
+            + pack_column("d", timestamps)
+            + bytes(name is not None for name in names))
+
+
+def check_strings(strings):
+    """Reject ids and usernames the NUL-separated string table cannot hold"""
+    for text in strings:
+        if text is not None and (type(text) is not str or SEPARATOR in text):
+            raise ValueError(f"Cannot snapshot {text!r}: ids and usernames must be "
+                             f"strings without NUL characters")
+
+
+def write_snapshot(system, path):
+    """
+    Write a LeaderboardSystem's players, pending updates and counters to path.
+    The file is written to a temporary name and renamed into place, so a
+    crash mid-write never leaves a truncated snapshot behind.
+    Time Complexity: O(n + q) for n players and q pending updates
+    """
+    # read the log position before the queue: an update accepted in between
+    # is then both pending and replayed, which re-applies it harmlessly in
+    # order, instead of being covered by the position but missing
+    log_position = system.log_position
+
+    players = list(system.engine.iter_ascending())
+    pending = system.update_queue.to_list()
+
+    player_ids = [p.player_id for p in players]
+    player_names = [p.username for p in players]
+    pending_ids = [u.player_id for u in pending]
+    pending_names = [u.username for u in pending]
+
+    check_strings(player_ids)
+    check_strings(player_names)
+    check_strings(pending_ids)
+    check_strings(pending_names)
+
+    player_scores = [p.score for p in players]
+    pending_scores = [u.new_score for u in pending]
+
+    flags = 0
+    if all_int64(player_scores):
+        flags |= PLAYER_SCORES_INT
+    if all_int64(pending_scores):
+        flags |= PENDING_SCORES_INT
+
+    strings = SEPARATOR.join(
+        name or "" for name in player_ids + player_names + pending_ids + pending_names
+    ).encode("utf-8")
+
+    header = HEADER.pack(MAGIC, VERSION, flags, len(players), len(pending),
+                         system.total_updates, system.updates_processed,
+                         system.updates_coalesced, len(strings), log_position)
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(header)
+        f.write(pack_section(player_scores, [p.timestamp for p in players],
+                             player_names, flags & PLAYER_SCORES_INT))
+        f.write(pack_section(pending_scores, [u.timestamp for u in pending],
+                             pending_names, flags & PENDING_SCORES_INT))
+        f.write(strings)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(temp_path, path)
+
+
+def read_snapshot(system, path):
+    """
+    Replace a LeaderboardSystem's state with the snapshot stored at path.
+    Raises ValueError if the file is not a snapshot this code can read.
+    Time Complexity: O(n + q)
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path} is too short to be a leaderboard snapshot")
+
+        (magic, version, flags, player_count, pending_count,
+         total_updates, updates_processed, updates_coalesced,
+         strings_size, log_position) = HEADER.unpack_from(data, 0)
+
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a leaderboard snapshot")
+        if version != VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+
+        columns_size = 17 * (player_count + pending_count)
+        if len(data) != HEADER.size + columns_size + strings_size:
+            raise ValueError(f"{path} is truncated or corrupt")
+
+        offset = HEADER.size
+        player_scores, offset = unpack_column(
+            data, offset, player_count, "q" if flags & PLAYER_SCORES_INT else "d")
+        player_times, offset = unpack_column(data, offset, player_count, "d")
+        player_has_name = data[offset:offset + player_count]
+        offset += player_count
+
+        pending_scores, offset = unpack_column(
+            data, offset, pending_count, "q" if flags & PENDING_SCORES_INT else "d")
+        pending_times, offset = unpack_column(data, offset, pending_count, "d")
+        pending_has_name = data[offset:offset + pending_count]
+        offset += pending_count
+
+        strings = data[offset:].decode("utf-8").split(SEPARATOR)
+
+    player_ids = strings[:player_count]
+    player_names = strings[player_count:2 * player_count]
+    pending_ids = strings[2 * player_count:2 * player_count + pending_count]
+    pending_names = strings[2 * player_count + pending_count:2 * (player_count + pending_count)]
+
+    # restore None usernames (rare, so only scan the flags when needed)
+    if 0 in player_has_name:
+        player_names = [name if has else None for name, has in zip(player_names, player_has_name)]
+    if 0 in pending_has_name:
+        pending_names = [name if has else None for name, has in zip(pending_names, pending_has_name)]
+
+    # Allocating millions of objects would trigger repeated cyclic garbage
+    # collections that find nothing to free; pausing the collector for the
+    # rebuild roughly halves restore time
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        players = list(map(Player, player_ids, player_names, player_scores, player_times))
+        pending = list(map(UpdateRequest, pending_ids, pending_scores, pending_times, pending_names))
+
+        # players were written in ascending order → O(n) balanced rebuild
+        system.engine.bulk_load(players, presorted=True)
+        system.player_lookup.clear()
+        system.player_lookup.update(zip(player_ids, players))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    system.update_queue.clear()
+    for update in pending:
+        system.update_queue.enqueue(update)
+
+    system.total_updates = total_updates
+    system.updates_processed = updates_processed
+    system.updates_coalesced = updates_coalesced
+    system.log_position = log_position
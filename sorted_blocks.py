@@ -0,0 +1,400 @@
+"""
+Array-backed ranking engine: a sorted list split into blocks.
+"""
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+from player import ranking_key
+from ranking_engine import RankingEngine
+
+
+class AboveAll:
+    """Compares greater than any player_id, so (score, ABOVE_ALL) sorts after every key with that score"""
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return True
+
+
+ABOVE_ALL = AboveAll()
+
+
+class SortedBlockList(RankingEngine):
+    """
+    Players kept in ascending (score, player_id) order in a list of blocks.
+
+    Each block is a Python list of up to 2 * load Players, with a parallel
+    list of their ranking keys so bisect compares tuples in C instead of
+    calling Player.__lt__. maxes holds each block's largest key, so finding
+    a player's block is a bisect over maxes and finding its slot a bisect
+    inside one block; inserting or deleting shifts at most 2 * load slots.
+
+    Ranks come from cumulative block counts (offsets). They are rebuilt
+    lazily with one accumulate() after a write, so a burst of writes pays
+    for them once and reads between writes pay nothing. Top-N is a slice of
+    the last block.
+
+    Compared with the AVL tree: contiguous lists instead of one node object
+    per player, and far fewer Python-level steps per query, at the cost of
+    O(load) list shifts per write and a key tuple per player.
+    """
+
+    def __init__(self, load=512):
+        self.load = load
+        self.blocks = []  # lists of Players, ascending
+        self.keys = []  # ranking keys parallel to blocks
+        self.maxes = []  # last key of each block
+        self.offsets = None  # offsets[i] = players before block i; None when stale
+        self.size = 0
+        self.hooks = None  # HookRegistry while tracers are attached (see hooks.py)
+
+    # ------------------------------------------------------------------
+    # Positions
+    # ------------------------------------------------------------------
+
+    def get_offsets(self):
+        """Cumulative block sizes, rebuilt if a write made them stale"""
+        if self.offsets is None:
+            self.offsets = [0]
+            self.offsets.extend(accumulate(map(len, self.blocks)))
+        return self.offsets
+
+    def locate(self, key):
+        """
+        (block, position) where key is, or would be inserted.
+        The engine must not be empty.
+        """
+        block = bisect_left(self.maxes, key)
+        if block == len(self.maxes):
+            block -= 1
+        return block, bisect_left(self.keys[block], key)
+
+    def count_keys_below(self, key, inclusive=False):
+        """Number of players whose key is below key (or equal, if inclusive)"""
+        search = bisect_right if inclusive else bisect_left
+
+        block = search(self.maxes, key)
+        if block == len(self.maxes):
+            return self.size
+        return self.get_offsets()[block] + search(self.keys[block], key)
+
+    def block_at(self, index):
+        """(block, position) of the player at ascending index 0 <= index < size"""
+        offsets = self.get_offsets()
+        block = bisect_right(offsets, index) - 1
+        return block, index - offsets[block]
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def insert(self, player):
+        """
+        Insert a player.
+        Time Complexity: O(log n + load)
+        """
+        hooks = self.hooks
+        if hooks is not None:
+            hooks.begin("blocks.insert")
+
+        try:
+            self.add(player, ranking_key(player))
+            return player
+        finally:
+            if hooks is not None:
+                hooks.end("blocks.insert")
+
+    def add(self, player, key):
+        if not self.blocks:
+            self.blocks.append([player])
+            self.keys.append([key])
+            self.maxes.append(key)
+        else:
+            block, position = self.locate(key)
+            keys = self.keys[block]
+            keys.insert(position, key)
+            self.blocks[block].insert(position, player)
+            self.maxes[block] = keys[-1]
+
+            if len(keys) > 2 * self.load:
+                self.split(block)
+
+        self.size += 1
+        self.offsets = None
+
+    def split(self, block):
+        """Split an oversized block into two halves"""
+        half = len(self.keys[block]) // 2
+
+        self.blocks.insert(block + 1, self.blocks[block][half:])
+        self.keys.insert(block + 1, self.keys[block][half:])
+        del self.blocks[block][half:]
+        del self.keys[block][half:]
+
+        self.maxes[block] = self.keys[block][-1]
+        self.maxes.insert(block + 1, self.keys[block + 1][-1])
+
+    def delete_player(self, player):
+        """
+        Delete a player; it must carry the score it was inserted with.
+        Time Complexity: O(log n + load)
+        """
+        hooks = self.hooks
+        if hooks is not None:
+            hooks.begin("blocks.delete")
+
+        try:
+            return self.discard(ranking_key(player))
+        finally:
+            if hooks is not None:
+                hooks.end("blocks.delete")
+
+    def discard(self, key):
+        if not self.blocks:
+            return False
+
+        block, position = self.locate(key)
+        keys = self.keys[block]
+        if position == len(keys) or keys[position] != key:
+            return False
+
+        del keys[position]
+        del self.blocks[block][position]
+        self.size -= 1
+        self.offsets = None
+
+        if not keys:
+            del self.blocks[block]
+            del self.keys[block]
+            del self.maxes[block]
+        else:
+            self.maxes[block] = keys[-1]
+            if len(keys) < self.load // 4 and len(self.blocks) > 1:
+                self.merge(block)
+
+        return True
+
+    def merge(self, block):
+        """Join an undersized block with a neighbour"""
+        if block + 1 == len(self.blocks):
+            block -= 1
+
+        self.blocks[block].extend(self.blocks[block + 1])
+        self.keys[block].extend(self.keys[block + 1])
+        self.maxes[block] = self.keys[block][-1]
+        del self.blocks[block + 1]
+        del self.keys[block + 1]
+        del self.maxes[block + 1]
+
+        if len(self.keys[block]) > 2 * self.load:
+            self.split(block)
+
+    def update_player_score(self, player, new_score):
+        """
+        Change the score of a player already in the engine, in place.
+        If the new key stays between the same two neighbours only the key
+        changes; otherwise the player is moved.
+        Time Complexity: O(log n + load)
+        """
+        hooks = self.hooks
+        if hooks is not None:
+            hooks.begin("blocks.update")
+
+        try:
+            old_key = ranking_key(player)
+            if not self.blocks:
+                return False
+
+            block, position = self.locate(old_key)
+            keys = self.keys[block]
+            if position == len(keys) or keys[position] != old_key:
+                return False
+
+            new_key = (new_score, player.player_id)
+
+            if position > 0:
+                lower = keys[position - 1]
+            else:
+                lower = self.maxes[block - 1] if block > 0 else None
+            if position + 1 < len(keys):
+                higher = keys[position + 1]
+            else:
+                higher = self.keys[block + 1][0] if block + 1 < len(self.keys) else None
+
+            # Same neighbours → only the key changes
+            if (lower is None or lower < new_key) and (higher is None or new_key < higher):
+                keys[position] = new_key
+                if position + 1 == len(keys):
+                    self.maxes[block] = new_key
+                player.score = new_score
+                return True
+
+            self.discard(old_key)
+            player.score = new_score
+            self.add(player, new_key)
+            return True
+        finally:
+            if hooks is not None:
+                hooks.end("blocks.update")
+
+    def bulk_load(self, players, presorted=False):
+        """
+        Replace the contents with players, cut into full blocks.
+        Player ids must be unique. Pass presorted=True if players are already
+        in ascending (score, player_id) order to skip the sort.
+        Time Complexity: O(n) presorted, O(n log n) otherwise
+        """
+        if presorted:
+            players = list(players)
+        else:
+            players = sorted(players, key=ranking_key)
+
+        load = self.load
+        self.blocks = [players[start:start + load] for start in range(0, len(players), load)]
+        self.keys = [list(map(ranking_key, block)) for block in self.blocks]
+        self.maxes = [keys[-1] for keys in self.keys]
+        self.size = len(players)
+        self.offsets = None
+
+    def clear(self):
+        """Remove all players"""
+        self.blocks = []
+        self.keys = []
+        self.maxes = []
+        self.size = 0
+        self.offsets = None
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def search(self, player_id):
+        """
+        Search for a player by player_id.
+        Time Complexity: O(n) - the order is by score, not id
+        """
+        hooks = self.hooks
+        if hooks is not None:
+            hooks.begin("blocks.search")
+
+        try:
+            for block in self.blocks:
+                for player in block:
+                    if player.player_id == player_id:
+                        return player
+            return None
+        finally:
+            if hooks is not None:
+                hooks.end("blocks.search")
+
+    def iter_ascending(self):
+        """Lazily yield players from low to high score"""
+        for block in self.blocks:
+            yield from block
+
+    def iter_range(self, offset, limit=None):
+        """
+        Lazily yield up to limit players in rank order, skipping the first
+        offset players (offset 0 starts at rank 1).
+        Time Complexity: O(log n + limit), copied a block slice at a time
+        """
+        if (limit is not None and limit <= 0) or offset >= self.size:
+            return
+
+        block, end = self.block_at(self.size - 1 - max(offset, 0))
+        end += 1  # slice end within the block
+
+        while block >= 0:
+            start = 0 if limit is None else max(0, end - limit)
+            chunk = self.blocks[block][start:end]
+            chunk.reverse()
+            yield from chunk
+
+            if limit is not None:
+                limit -= len(chunk)
+                if limit == 0:
+                    return
+
+            block -= 1
+            end = len(self.blocks[block]) if block >= 0 else 0
+
+    def get_leaderboard(self):
+        """Get the leaderboard, highest score first"""
+        leaderboard = []
+        for block in reversed(self.blocks):
+            leaderboard.extend(reversed(block))
+        return leaderboard
+
+    def get_top_n(self, n):
+        """
+        Get the top N players with highest scores.
+        Time Complexity: O(N) - a slice of the last block(s)
+        """
+        if self.blocks and 0 < n <= len(self.blocks[-1]):
+            top = self.blocks[-1][-n:]
+            top.reverse()
+            return top
+        return list(self.iter_range(0, n))
+
+    def count_ahead(self, player):
+        """
+        Count the players ranked strictly above the given player's
+        (score, player_id) position. The player does not need to be present.
+        Time Complexity: O(log n)
+        """
+        return self.size - self.count_keys_below(ranking_key(player), inclusive=True)
+
+    def rank_of_player(self, player):
+        """
+        Get the rank (1 = highest score) of a player already in the engine,
+        or -1 if it is not there.
+        Time Complexity: O(log n)
+        """
+        key = ranking_key(player)
+        if not self.blocks:
+            return -1
+
+        block, position = self.locate(key)
+        keys = self.keys[block]
+        if position == len(keys) or keys[position] != key:
+            return -1
+
+        return self.size - (self.get_offsets()[block] + position)
+
+    def player_at_rank(self, rank):
+        """
+        Get the player holding a given rank (1 = highest score).
+        Returns None if the rank is out of range.
+        Time Complexity: O(log n)
+        """
+        if rank < 1 or rank > self.size:
+            return None
+
+        block, position = self.block_at(self.size - rank)
+        return self.blocks[block][position]
+
+    def count_below(self, score):
+        """
+        Count the players whose score is strictly lower than score.
+        Time Complexity: O(log n)
+        """
+        # (score,) sorts before every key with that score
+        return self.count_keys_below((score,))
+
+    def count_above(self, score):
+        """
+        Count the players whose score is strictly higher than score.
+        Time Complexity: O(log n)
+        """
+        return self.size - self.count_keys_below((score, ABOVE_ALL))
+
+    def get_shape(self):
+        """Block count and fill"""
+        return {
+            'size': self.size,
+            'blocks': len(self.blocks),
+            'load': self.load,
+            'largest_block': max(map(len, self.blocks), default=0),
+        }
@@ -0,0 +1,305 @@
+"""
+Write-ahead log for accepted score updates.
+
+Every update accepted by submit_score can be appended here before it is
+queued, so a crash loses at most the updates of one unflushed group instead
+of the whole in-memory queue. Player removals and leaderboard clears are
+logged too, as their own entry kinds. On startup, entries newer than the
+last snapshot are replayed in FIFO order.
+
+Entry layout (little-endian):
+    frame     payload_length (uint32), crc32 of payload (uint32)
+    payload   sequence (uint64), op (uint8, see OP_*), timestamp (float64),
+              score kind (uint8, 0 = int64, 1 = float64), score (8 bytes),
+              id length (uint32), id UTF-8, username length (int32,
+              -1 = None), username UTF-8
+"""
+import os
+import struct
+import threading
+import time
+import zlib
+
+from FIFO_Queue import UpdateRequest
+
+FRAME = struct.Struct("<II")
+PAYLOAD = struct.Struct("<QBdB8sI")
+INT_SCORE = struct.Struct("<q")
+FLOAT_SCORE = struct.Struct("<d")
+NAME_LENGTH = struct.Struct("<i")
+
+SCORE_INT = 0
+SCORE_FLOAT = 1
+
+# entry kinds; remove and clear entries carry a placeholder score
+OP_SUBMIT = 0  # a score update, replayed through the queue
+OP_REMOVE = 1  # remove_player(player_id)
+OP_CLEAR = 2   # clear_leaderboard(), player_id is ""
+
+
+def check_update(update):
+    """
+    Reject an update encode_entry cannot log, so it can be refused before
+    it is queued: ids must be strings, usernames strings or None, and
+    scores real numbers.
+    """
+    if not isinstance(update.player_id, str) or not (update.username is None
+                                                     or isinstance(update.username, str)):
+        raise ValueError(f"Cannot log update for {update.player_id!r} ({update.username!r}): "
+                         f"ids and usernames must be strings")
+    if not isinstance(update.new_score, (int, float)):
+        raise ValueError(f"Cannot log score {update.new_score!r}: scores must be int or float")
+
+
+def encode_entry(sequence, update, op=OP_SUBMIT):
+    """Encode one update (or op entry) as a framed, checksummed log entry"""
+    if type(update.new_score) is int and -(1 << 63) <= update.new_score < (1 << 63):
+        kind, score = SCORE_INT, INT_SCORE.pack(update.new_score)
+    else:
+        kind, score = SCORE_FLOAT, FLOAT_SCORE.pack(update.new_score)
+
+    player_id = update.player_id.encode("utf-8")
+    if update.username is None:
+        name = b""
+        name_length = -1
+    else:
+        name = update.username.encode("utf-8")
+        name_length = len(name)
+
+    payload = (PAYLOAD.pack(sequence, op, update.timestamp, kind, score, len(player_id))
+               + player_id + NAME_LENGTH.pack(name_length) + name)
+    return FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_payload(payload):
+    """Decode a payload back into (sequence, op, UpdateRequest)"""
+    sequence, op, timestamp, kind, score, id_length = PAYLOAD.unpack_from(payload, 0)
+    offset = PAYLOAD.size
+
+    score = (INT_SCORE if kind == SCORE_INT else FLOAT_SCORE).unpack(score)[0]
+    player_id = payload[offset:offset + id_length].decode("utf-8")
+    offset += id_length
+
+    name_length = NAME_LENGTH.unpack_from(payload, offset)[0]
+    offset += NAME_LENGTH.size
+    username = None if name_length < 0 else payload[offset:offset + name_length].decode("utf-8")
+
+    return sequence, op, UpdateRequest(player_id, score, timestamp, username=username)
+
+
+def read_entries(data):
+    """
+    Yield (sequence, op, UpdateRequest, end_offset) for each intact entry.
+    Stops at the first torn or corrupt entry (e.g. a crash mid-write).
+    """
+    offset = 0
+    while offset + FRAME.size <= len(data):
+        length, checksum = FRAME.unpack_from(data, offset)
+        start = offset + FRAME.size
+        payload = data[start:start + length]
+
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            return
+
+        offset = start + length
+        sequence, op, update = decode_payload(payload)
+        yield sequence, op, update, offset
+
+
+class UpdateLog:
+    """
+    Append-only update log with group commit.
+
+    append() only encodes into an in-memory buffer and never touches the
+    file. A background committer thread writes the buffer (and, with
+    durable=True, fsyncs it) as one group once group_size entries are
+    waiting or group_interval seconds after the first of them was
+    buffered, whichever comes first - also when submissions stop. So the
+    per-update cost is an encode, not a syscall, and an appended entry is
+    on disk within about group_interval seconds plus one write and fsync.
+    flush() commits immediately, on the caller's thread. Updates in an
+    uncommitted group are the ones a crash can still lose.
+
+    Every entry gets an increasing sequence number; a snapshot records the
+    last sequence it covers so recovery replays only newer entries.
+    """
+
+    def __init__(self, path, durable=True, group_size=256, group_interval=0.01, start_sequence=0):
+        """
+        Open (or create) the log at path and start the committer thread.
+        A torn entry left at the end by a crash is cut off so new entries
+        are appended after the last intact one. Sequence numbers continue
+        after the newest entry in the file or start_sequence, whichever is
+        larger (the log may have been truncated up to a snapshot).
+        """
+        self.path = path
+        self.durable = durable
+        self.group_size = group_size
+        self.group_interval = group_interval
+
+        # lock guards the buffer (submitters may append from many threads);
+        # commit_lock serializes writes to the file, so groups land in order
+        # and appends never wait for a write or fsync
+        self.lock = threading.Lock()
+        self.commit_lock = threading.Lock()
+        self.group_waiting = threading.Condition(self.lock)
+        self.buffer = bytearray()
+        self.buffered = 0  # entries in buffer
+        self.first_buffered = 0.0  # time.monotonic() of the oldest buffered entry
+        self.closed = False
+        self.failure = None  # error that stopped the committer
+
+        # find the end of the intact entries and the newest sequence number
+        self.last_sequence = 0
+        valid_end = 0
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            for sequence, _, _, end in read_entries(data):
+                self.last_sequence = sequence
+                valid_end = end
+
+        self.last_sequence = max(self.last_sequence, start_sequence)
+
+        self.file = open(path, "ab", buffering=0)
+        if self.file.tell() != valid_end:
+            self.file.truncate(valid_end)
+            self.sync()
+
+        # Statistics
+        self.commits = 0
+        self.entries_written = 0
+
+        self.committer = threading.Thread(target=self.commit_loop, name="update-log-commit", daemon=True)
+        self.committer.start()
+
+    def append(self, update, op=OP_SUBMIT):
+        """
+        Add an update (or an op entry, see OP_*) to the log and return its
+        sequence number. The committer thread writes it (see UpdateLog).
+        Time Complexity: O(1) - never waits for the file
+        """
+        with self.lock:
+            if self.failure is not None:
+                raise self.failure
+
+            self.last_sequence += 1
+            self.buffer += encode_entry(self.last_sequence, update, op)
+            self.buffered += 1
+
+            if self.buffered == 1:
+                self.first_buffered = time.monotonic()
+                self.group_waiting.notify()
+            elif self.buffered == self.group_size:
+                self.group_waiting.notify()
+
+            return self.last_sequence
+
+    def group_due(self):
+        """Seconds until the buffered group must be committed (None if empty); caller holds the lock"""
+        if not self.buffered:
+            return None
+        if self.buffered >= self.group_size:
+            return 0
+        return max(0.0, self.first_buffered + self.group_interval - time.monotonic())
+
+    def commit_loop(self):
+        """Committer thread: commit each group when it is due, until close()"""
+        while True:
+            with self.lock:
+                while not self.closed and self.group_due() != 0:
+                    self.group_waiting.wait(self.group_due())
+                if self.closed:
+                    return
+
+            try:
+                self.flush()
+            except OSError as error:
+                # surface the error to the next append() or flush()
+                with self.lock:
+                    self.failure = error
+                return
+
+    def flush(self):
+        """Write (and fsync, if durable) every buffered entry now"""
+        with self.commit_lock:
+            self.commit()
+
+    def commit(self):
+        """Write the buffered group as a single write; caller holds commit_lock"""
+        with self.lock:
+            if self.failure is not None:
+                raise self.failure
+
+            buffer, count = self.buffer, self.buffered
+            self.buffer = bytearray()
+            self.buffered = 0
+
+        if not count:
+            return
+
+        self.file.write(buffer)
+        if self.durable:
+            self.sync()
+
+        self.commits += 1
+        self.entries_written += count
+
+    def sync(self):
+        """Force written entries to disk"""
+        if hasattr(os, "fdatasync"):
+            os.fdatasync(self.file.fileno())
+        else:
+            os.fsync(self.file.fileno())
+
+    def replay(self, after_sequence=0):
+        """
+        Get (op, UpdateRequest) for the entries with a sequence number above
+        after_sequence, in the order they were appended (FIFO).
+        """
+        self.flush()
+        with open(self.path, "rb") as f:
+            data = f.read()
+
+        return [(op, update) for sequence, op, update, _ in read_entries(data)
+                if sequence > after_sequence]
+
+    def truncate(self, through_sequence):
+        """
+        Drop the entries up to and including through_sequence, e.g. once a
+        snapshot covers them. Newer entries are kept, and sequence numbers
+        keep counting up from where they were.
+        """
+        with self.commit_lock:
+            self.commit()
+
+            with open(self.path, "rb") as f:
+                data = f.read()
+
+            keep_from = 0
+            for sequence, _, _, end in read_entries(data):
+                if sequence > through_sequence:
+                    break
+                keep_from = end
+
+            # rewrite the survivors to a new file and swap it in atomically
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data[keep_from:])
+                f.flush()
+                os.fsync(f.fileno())
+
+            self.file.close()
+            os.replace(temp_path, self.path)
+            self.file = open(self.path, "ab", buffering=0)
+
+    def close(self):
+        """Stop the committer, commit buffered entries and close the file"""
+        with self.lock:
+            self.closed = True
+            self.group_waiting.notify()
+        self.committer.join()
+
+        with self.commit_lock:
+            self.commit()
+            self.file.close()